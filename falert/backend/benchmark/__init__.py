@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+from resource import RUSAGE_CHILDREN, RUSAGE_SELF, getrusage
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple
+
+
+class Timings:
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.__durations: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start_time = perf_counter()
+
+        try:
+            yield
+        finally:
+            self.__durations.setdefault(stage, []).append(perf_counter() - start_time)
+
+    def summarize(self) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: {
+                "count": len(durations),
+                "mean": sum(durations) / len(durations),
+                "min": min(durations),
+                "max": max(durations),
+            }
+            for stage, durations in self.__durations.items()
+        }
+
+
+async def measure_peak_memory(
+    function: Callable[[], Awaitable[Any]]
+) -> Tuple[Any, int]:
+    # tracing slows allocations down, so it is kept out of the timed runs
+    start()
+
+    try:
+        result = await function()
+        _, peak = get_traced_memory()
+    finally:
+        stop()
+
+    return result, peak
+
+
+def get_max_resident_memory() -> Dict[str, int]:
+    # ru_maxrss is reported in kilobytes on linux
+    return {
+        "self": getrusage(RUSAGE_SELF).ru_maxrss * 1024,
+        "children": getrusage(RUSAGE_CHILDREN).ru_maxrss * 1024,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = []
+
+    for key, value in report.items():
+        if key == "stages":
+            lines.append("stages:")
+            lines.extend(
+                f"  {stage:<12} {summary['mean'] * 1000:10.2f} ms mean"
+                f" {summary['min'] * 1000:10.2f} ms min"
+                f" {summary['max'] * 1000:10.2f} ms max"
+                f" ({summary['count']}x)"
+                for stage, summary in value.items()
+            )
+        elif isinstance(value, dict):
+            lines.append(f"{key}:")
+            lines.extend(f"  {name:<12} {item}" for name, item in value.items())
+        elif isinstance(value, float):
+            lines.append(f"{key}: {value:.3f}")
+        else:
+            lines.append(f"{key}: {value}")
+
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+from argparse import ArgumentParser
+from asyncio import run
+from json import dumps
+from os.path import join
+from tempfile import TemporaryDirectory
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from falert.backend.benchmark import format_report
+from falert.backend.benchmark.harvester import benchmark_decoding
+from falert.backend.benchmark.ingestion import (
+    benchmark_ingestion,
+    write_fire_location_file,
+)
+from falert.backend.benchmark.matcher import benchmark_matching
+from falert.backend.benchmark.workload import (
+    generate_fire_location_rows,
+    generate_workload,
+)
+from falert.backend.common.configuration import load_from_environment
+from falert.backend.matcher.engine import (
+    BaseMatchingEngine,
+    LocalMatchingEngine,
+    ProcessPoolMatchingEngine,
+)
+
+
+def _run_matcher_benchmark(arguments) -> dict:
+    workload = generate_workload(
+        arguments.subscriptions,
+        arguments.fire_locations,
+        min_vertices=arguments.min_vertices,
+        max_vertices=arguments.max_vertices,
+        clusters_count=arguments.clusters,
+        seed=arguments.seed,
+    )
+
+    matching_engine: BaseMatchingEngine = LocalMatchingEngine()
+
+    if arguments.workers > 0:
+        matching_engine = ProcessPoolMatchingEngine(arguments.workers)
+
+    try:
+        return run(
+            benchmark_matching(
+                workload,
+                matching_engine,
+                arguments.runs,
+                warmup_runs=arguments.warmup_runs,
+            )
+        )
+    finally:
+        matching_engine.close()
+
+
+def _run_decoder_benchmark(arguments) -> dict:
+    return benchmark_decoding(
+        generate_fire_location_rows(arguments.rows, seed=arguments.seed),
+        arguments.runs,
+    )
+
+
+async def _benchmark_ingestion(arguments, path: str) -> dict:
+    engine = create_async_engine(load_from_environment().database_url)
+
+    try:
+        return await benchmark_ingestion(
+            engine,
+            path,
+            replay_speed=arguments.replay_speed,
+            commit_size=arguments.commit_size,
+            commit_interval=arguments.commit_interval,
+            raw_storage=arguments.raw_storage,
+        )
+    finally:
+        await engine.dispose()
+
+
+def _run_ingestion_benchmark(arguments) -> dict:
+    if arguments.path is not None:
+        return run(_benchmark_ingestion(arguments, arguments.path))
+
+    with TemporaryDirectory() as directory:
+        path = join(directory, "fire_locations.csv.gz")
+
+        write_fire_location_file(
+            path, generate_fire_location_rows(arguments.rows, seed=arguments.seed)
+        )
+
+        return run(_benchmark_ingestion(arguments, path))
+
+
+def main() -> None:
+    parser = ArgumentParser(prog="python3 -m falert.backend.benchmark")
+    parser.add_argument("--json", action="store_true")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    matcher_parser = subparsers.add_parser("matcher")
+    matcher_parser.add_argument("--subscriptions", type=int, default=1000)
+    matcher_parser.add_argument("--fire-locations", type=int, default=100000)
+    matcher_parser.add_argument("--min-vertices", type=int, default=4)
+    matcher_parser.add_argument("--max-vertices", type=int, default=64)
+    matcher_parser.add_argument("--clusters", type=int, default=50)
+    matcher_parser.add_argument("--seed", type=int, default=0)
+    matcher_parser.add_argument("--workers", type=int, default=0)
+    matcher_parser.add_argument("--runs", type=int, default=10)
+    matcher_parser.add_argument("--warmup-runs", type=int, default=1)
+    matcher_parser.set_defaults(function=_run_matcher_benchmark)
+
+    decoder_parser = subparsers.add_parser("decoder")
+    decoder_parser.add_argument("--rows", type=int, default=50000)
+    decoder_parser.add_argument("--seed", type=int, default=0)
+    decoder_parser.add_argument("--runs", type=int, default=3)
+    decoder_parser.set_defaults(function=_run_decoder_benchmark)
+
+    # runs the harvester against the database of the environment
+    ingestion_parser = subparsers.add_parser("ingestion")
+    ingestion_parser.add_argument("--path")
+    ingestion_parser.add_argument("--rows", type=int, default=100000)
+    ingestion_parser.add_argument("--seed", type=int, default=0)
+    ingestion_parser.add_argument("--replay-speed", type=float)
+    ingestion_parser.add_argument("--commit-size", type=int, default=10000)
+    ingestion_parser.add_argument("--commit-interval", type=float, default=10.0)
+    ingestion_parser.add_argument(
+        "--raw-storage", choices=["json", "compressed", "none"], default="json"
+    )
+    ingestion_parser.set_defaults(function=_run_ingestion_benchmark)
+
+    arguments = parser.parse_args()
+    report = arguments.function(arguments)
+
+    print(dumps(report, indent=2) if arguments.json else format_report(report))
+
+
+main()
@@ -0,0 +1,53 @@
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Mapping
+
+from falert.backend.common.input import NASAFireLocationInputSchema
+from falert.backend.harvester.decoder import NASAFireLocationDecoder
+
+
+def _decode_with_schema(row: Mapping[str, str]) -> Dict[str, Any]:
+    # the harvester before the decoder: a new schema per row and the
+    # acquisition time parsed again on each of its two accesses
+    fire_location_input = NASAFireLocationInputSchema().load(row)
+
+    for _ in range(2):
+        acquired = datetime.strptime(
+            f"{fire_location_input.acq_date} {fire_location_input.acq_time}",
+            "%Y-%m-%d %H%M",
+        )
+
+    return {
+        "latitude": fire_location_input.latitude,
+        "longitude": fire_location_input.longitude,
+        "acquired": acquired,
+    }
+
+
+def benchmark_decoding(rows: List[Dict[str, str]], runs: int) -> Dict[str, Any]:
+    decoders: Dict[str, Callable[[Mapping[str, str]], Dict[str, Any]]] = {
+        "schema": _decode_with_schema,
+        "strict": NASAFireLocationDecoder(strict_validation=True).decode,
+        "fast": NASAFireLocationDecoder().decode,
+    }
+
+    rows_per_second = {}
+
+    for name, decode in decoders.items():
+        duration = float("inf")
+
+        for _ in range(runs):
+            start_time = perf_counter()
+
+            for row in rows:
+                decode(row)
+
+            duration = min(duration, perf_counter() - start_time)
+
+        rows_per_second[name] = round(len(rows) / duration)
+
+    return {
+        "rows": len(rows),
+        "runs": runs,
+        "rows_per_second": rows_per_second,
+    }
@@ -0,0 +1,85 @@
+from csv import DictWriter
+from gzip import open as open_gzip
+from logging import getLogger
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from falert.backend.benchmark import get_max_resident_memory
+from falert.backend.common.entity import DatasetEntity, FireLocationEntity
+from falert.backend.common.messenger import Sender
+from falert.backend.harvester.file import NASAFileHarvester
+
+
+class CountingSender(Sender):
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.__count = 0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    async def _on_send(self, channel_name: str, data: str) -> None:
+        self.__count += 1
+
+
+def write_fire_location_file(path: str, rows: List[Dict[str, str]]) -> None:
+    with open_gzip(path, "wt", encoding="utf-8", newline="") as file:
+        writer = DictWriter(file, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# pylint: disable=too-many-arguments
+async def benchmark_ingestion(
+    engine: AsyncEngine,
+    path: str,
+    replay_speed: Optional[float] = None,
+    commit_size: int = 10000,
+    commit_interval: float = 10.0,
+    raw_storage: str = "json",
+) -> Dict[str, Any]:
+    # a new dataset for every run, so no row is skipped as already reported
+    dataset_url = f"{Path(path).absolute().as_uri()}#benchmark-{uuid4()}"
+    sender = CountingSender()
+
+    harvester = NASAFileHarvester(
+        engine,
+        sender,
+        getLogger(__name__),
+        dataset_url,
+        replay_speed=replay_speed,
+        commit_size=commit_size,
+        commit_interval=commit_interval,
+        raw_storage=raw_storage,
+    )
+
+    start_time = perf_counter()
+    await harvester.run()
+    duration = perf_counter() - start_time
+
+    async with AsyncSession(engine) as database_session:
+        inserted_fire_locations = (
+            await database_session.execute(
+                select(func.count(FireLocationEntity.id))
+                .join(DatasetEntity, DatasetEntity.id == FireLocationEntity.dataset_id)
+                .where(DatasetEntity.url == dataset_url)
+            )
+        ).scalar()
+
+    return {
+        "dataset_url": dataset_url,
+        "fire_locations": inserted_fire_locations,
+        "triggers": sender.count,
+        "seconds": duration,
+        "fire_locations_per_second": inserted_fire_locations / duration
+        if duration > 0
+        else 0.0,
+        "max_resident_memory": get_max_resident_memory(),
+    }
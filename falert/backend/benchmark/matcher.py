@@ -0,0 +1,156 @@
+from datetime import datetime
+from logging import getLogger
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID, uuid4
+
+from falert.backend.benchmark import (
+    Timings,
+    get_max_resident_memory,
+    measure_peak_memory,
+)
+from falert.backend.benchmark.workload import SyntheticWorkload
+from falert.backend.matcher.cache import SubscriptionGeometryCache
+from falert.backend.matcher.engine import BaseMatchingEngine
+from falert.backend.matcher.process import (
+    BaseMatchingStore,
+    FireLocationRow,
+    NewMatch,
+    match_in_process,
+)
+
+# the synthetic fire locations are all acquired at the same time
+ACQUIRED = datetime(2022, 3, 1)
+
+
+class InMemoryStore(BaseMatchingStore):
+    # stands in for the tables a matching run reads and writes
+    def __init__(self, workload: SyntheticWorkload) -> None:
+        super().__init__()
+
+        self.__subscriptions = workload.subscriptions
+        self.__fire_locations = list(
+            zip(
+                workload.fire_location_ids,
+                workload.latitudes.tolist(),
+                workload.longitudes.tolist(),
+                [ACQUIRED] * len(workload.fire_location_ids),
+            )
+        )
+        self.__matched_fire_locations: Set[Tuple[UUID, UUID]] = set()
+
+    @property
+    def subscriptions(self) -> List[Tuple[UUID, bytes]]:
+        return self.__subscriptions
+
+    @property
+    def matched_fire_locations(self) -> Set[Tuple[UUID, UUID]]:
+        return self.__matched_fire_locations
+
+    # pylint: disable=invalid-overridden-method
+    async def stream_fire_locations(
+        self, partition_size: int
+    ) -> AsyncIterator[List[FireLocationRow]]:
+        for offset in range(0, len(self.__fire_locations), partition_size):
+            yield self.__fire_locations[offset : offset + partition_size]
+
+    async def update_subscription_geometries(
+        self,
+        subscription_geometry_cache: SubscriptionGeometryCache,
+        subscription_ids: List[UUID],
+    ) -> None:
+        for subscription_id, geometry in self.__subscriptions:
+            if subscription_id in subscription_ids:
+                subscription_geometry_cache.update(subscription_id, geometry)
+
+    async def select_matched_fire_locations(
+        self, subscription_ids: Optional[List[UUID]]
+    ) -> Set[Tuple[UUID, UUID]]:
+        return self.__matched_fire_locations
+
+    async def insert_subscription_matches(
+        self, matches: Sequence[NewMatch]
+    ) -> List[UUID]:
+        for subscription_id, fire_locations in matches:
+            self.__matched_fire_locations.update(
+                (subscription_id, fire_location_id)
+                for fire_location_id, _ in fire_locations
+            )
+
+        return [uuid4() for _ in matches]
+
+
+async def run_matching(
+    store: InMemoryStore,
+    subscription_geometry_cache: SubscriptionGeometryCache,
+    matching_engine: BaseMatchingEngine,
+    timings: Timings,
+) -> int:
+    # the same run as the matcher's, on a store that starts out empty
+    await match_in_process(
+        store,
+        subscription_geometry_cache,
+        matching_engine,
+        getLogger(__name__),
+        measure=timings.measure,
+    )
+
+    return len(store.matched_fire_locations)
+
+
+async def benchmark_matching(
+    workload: SyntheticWorkload,
+    matching_engine: BaseMatchingEngine,
+    runs: int,
+    warmup_runs: int = 1,
+) -> Dict[str, Any]:
+    timings = Timings()
+    subscription_geometry_cache = SubscriptionGeometryCache()
+
+    with timings.measure("cache"):
+        for subscription_id, geometry in workload.subscriptions:
+            subscription_geometry_cache.update(subscription_id, geometry)
+
+    # every run starts from an empty store, so all of them do the same work
+    for _ in range(warmup_runs):
+        await run_matching(
+            InMemoryStore(workload),
+            subscription_geometry_cache,
+            matching_engine,
+            Timings(),
+        )
+
+    matched_fire_locations = 0
+    duration = 0.0
+
+    for _ in range(runs):
+        store = InMemoryStore(workload)
+        start_time = perf_counter()
+
+        matched_fire_locations = await run_matching(
+            store, subscription_geometry_cache, matching_engine, timings
+        )
+
+        duration += perf_counter() - start_time
+
+    store = InMemoryStore(workload)
+
+    _, peak_memory = await measure_peak_memory(
+        lambda: run_matching(
+            store,
+            subscription_geometry_cache,
+            matching_engine,
+            Timings(),
+        )
+    )
+
+    return {
+        "subscriptions": len(workload.subscriptions),
+        "fire_locations": len(workload.fire_location_ids),
+        "matched_fire_locations": matched_fire_locations,
+        "runs": runs,
+        "runs_per_second": runs / duration if duration > 0 else 0.0,
+        "stages": timings.summarize(),
+        "peak_traced_memory": peak_memory,
+        "max_resident_memory": get_max_resident_memory(),
+    }
@@ -0,0 +1,170 @@
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+import numpy as np
+from shapely.geometry import Polygon
+
+# roughly the latitudes where FIRMS reports most of its fire locations
+MIN_LATITUDE, MAX_LATITUDE = -40.0, 65.0
+MIN_LONGITUDE, MAX_LONGITUDE = -180.0, 180.0
+
+
+class SyntheticWorkload:
+    def __init__(
+        self,
+        subscriptions: List[Tuple[UUID, bytes]],
+        fire_location_ids: List[UUID],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+    ) -> None:
+        super().__init__()
+
+        self.__subscriptions = subscriptions
+        self.__fire_location_ids = fire_location_ids
+        self.__latitudes = latitudes
+        self.__longitudes = longitudes
+
+    @property
+    def subscriptions(self) -> List[Tuple[UUID, bytes]]:
+        return self.__subscriptions
+
+    @property
+    def fire_location_ids(self) -> List[UUID]:
+        return self.__fire_location_ids
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self.__latitudes
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self.__longitudes
+
+
+def _generate_ids(random: np.random.Generator, count: int) -> List[UUID]:
+    data = random.bytes(count * 16)
+    return [UUID(bytes=data[index * 16 : (index + 1) * 16]) for index in range(count)]
+
+
+def _generate_polygon(
+    random: np.random.Generator,
+    latitude: float,
+    longitude: float,
+    radius: float,
+    vertices_count: int,
+) -> Polygon:
+    # sorted angles around the center always give a simple, star shaped polygon
+    angles = np.sort(random.uniform(0.0, 2.0 * np.pi, vertices_count))
+    radii = radius * random.uniform(0.5, 1.0, vertices_count)
+
+    return Polygon(
+        zip(
+            latitude + radii * np.cos(angles),
+            longitude + radii * np.sin(angles),
+        )
+    )
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def generate_workload(
+    subscriptions_count: int,
+    fire_locations_count: int,
+    min_vertices: int = 4,
+    max_vertices: int = 64,
+    clusters_count: int = 50,
+    seed: int = 0,
+) -> SyntheticWorkload:
+    random = np.random.default_rng(seed)
+
+    cluster_latitudes = random.uniform(MIN_LATITUDE, MAX_LATITUDE, clusters_count)
+    cluster_longitudes = random.uniform(MIN_LONGITUDE, MAX_LONGITUDE, clusters_count)
+    cluster_spreads = random.uniform(0.1, 2.0, clusters_count)
+
+    # most fire locations gather around a few active fire regions, the rest
+    # are scattered as a background of isolated detections
+    clustered_count = int(fire_locations_count * 0.9)
+    background_count = fire_locations_count - clustered_count
+    clusters = random.integers(0, clusters_count, clustered_count)
+
+    latitudes = np.clip(
+        np.concatenate(
+            [
+                random.normal(cluster_latitudes[clusters], cluster_spreads[clusters]),
+                random.uniform(MIN_LATITUDE, MAX_LATITUDE, background_count),
+            ]
+        ),
+        -90.0,
+        90.0,
+    )
+    longitudes = np.clip(
+        np.concatenate(
+            [
+                random.normal(cluster_longitudes[clusters], cluster_spreads[clusters]),
+                random.uniform(MIN_LONGITUDE, MAX_LONGITUDE, background_count),
+            ]
+        ),
+        -180.0,
+        180.0,
+    )
+
+    # half of the subscriptions watch the fire regions, the other half are
+    # spread everywhere, with sizes from a village to a whole country
+    subscriptions = []
+    subscription_ids = _generate_ids(random, subscriptions_count)
+
+    for index, subscription_id in enumerate(subscription_ids):
+        if index % 2 == 0:
+            cluster = random.integers(0, clusters_count)
+            latitude = random.normal(cluster_latitudes[cluster], 1.0)
+            longitude = random.normal(cluster_longitudes[cluster], 1.0)
+        else:
+            latitude = random.uniform(MIN_LATITUDE, MAX_LATITUDE)
+            longitude = random.uniform(MIN_LONGITUDE, MAX_LONGITUDE)
+
+        polygon = _generate_polygon(
+            random,
+            latitude,
+            longitude,
+            float(np.exp(random.uniform(np.log(0.05), np.log(5.0)))),
+            int(random.integers(min_vertices, max_vertices + 1)),
+        )
+
+        subscriptions.append((subscription_id, polygon.wkb))
+
+    return SyntheticWorkload(
+        subscriptions,
+        _generate_ids(random, fire_locations_count),
+        latitudes,
+        longitudes,
+    )
+
+
+def generate_fire_location_rows(count: int, seed: int = 0) -> List[Dict[str, str]]:
+    # rows as the csv reader returns them for the MODIS 24h file
+    random = np.random.default_rng(seed)
+
+    latitudes = random.uniform(MIN_LATITUDE, MAX_LATITUDE, count)
+    longitudes = random.uniform(MIN_LONGITUDE, MAX_LONGITUDE, count)
+    minutes = np.sort(random.integers(0, 2 * 24 * 60, count))
+    brightnesses = random.uniform(300.0, 500.0, count)
+    confidences = random.integers(0, 101, count)
+    frps = random.exponential(20.0, count)
+
+    return [
+        {
+            "latitude": f"{latitudes[index]:.5f}",
+            "longitude": f"{longitudes[index]:.5f}",
+            "brightness": f"{brightnesses[index]:.2f}",
+            "scan": "1.0",
+            "track": "1.0",
+            "acq_date": f"2022-03-{1 + minutes[index] // (24 * 60):02d}",
+            "acq_time": f"{minutes[index] // 60 % 24:02d}{minutes[index] % 60:02d}",
+            "satellite": "Terra" if index % 2 == 0 else "Aqua",
+            "confidence": str(confidences[index]),
+            "version": "6.1NRT",
+            "bright_t31": "290.00",
+            "frp": f"{frps[index]:.2f}",
+            "daynight": "D" if minutes[index] % (24 * 60) < 12 * 60 else "N",
+        }
+        for index in range(count)
+    ]
@@ -1,13 +1,15 @@
-from typing import Mapping, Any
+from typing import Mapping, Any, Optional
 from os import getenv
 
 from marshmallow import Schema, post_load
-from marshmallow.fields import String, Boolean, Int
+from marshmallow.fields import String, Boolean, Float, Int
+from marshmallow.validate import OneOf, Range
 from dotenv import load_dotenv
 
 
+# pylint: disable=too-many-instance-attributes, too-many-public-methods
 class Configuration:
-    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-arguments, too-many-locals
     def __init__(
         self,
         database_url: str,
@@ -17,6 +19,28 @@ class Configuration:
         aws_region_name: str,
         dry: bool,
         http_port: int,
+        matcher_workers: int,
+        matcher_engine: str,
+        matcher_debounce: float,
+        matcher_max_latency: float,
+        matcher_cache_resync_interval: float,
+        matcher_acquired_horizon_hours: float,
+        harvester_strict_validation: bool,
+        harvester_commit_size: int,
+        harvester_commit_interval: float,
+        harvester_interval: float,
+        harvester_jitter: float,
+        harvester_concurrency: int,
+        harvester_once: bool,
+        harvester_datasets: Optional[str],
+        harvester_parse_workers: int,
+        harvester_parse_range_size: int,
+        harvester_raw_storage: str,
+        harvester_retention_days: int,
+        harvester_retention_interval: float,
+        harvester_retention_detach: bool,
+        notifier_concurrency: int,
+        notifier_timeout: float,
     ) -> None:
         self.__database_url = database_url
         self.__database_echo = database_echo
@@ -25,6 +49,28 @@ class Configuration:
         self.__aws_region_name = aws_region_name
         self.__dry = dry
         self.__http_port = http_port
+        self.__matcher_workers = matcher_workers
+        self.__matcher_engine = matcher_engine
+        self.__matcher_debounce = matcher_debounce
+        self.__matcher_max_latency = matcher_max_latency
+        self.__matcher_cache_resync_interval = matcher_cache_resync_interval
+        self.__matcher_acquired_horizon_hours = matcher_acquired_horizon_hours
+        self.__harvester_strict_validation = harvester_strict_validation
+        self.__harvester_commit_size = harvester_commit_size
+        self.__harvester_commit_interval = harvester_commit_interval
+        self.__harvester_interval = harvester_interval
+        self.__harvester_jitter = harvester_jitter
+        self.__harvester_concurrency = harvester_concurrency
+        self.__harvester_once = harvester_once
+        self.__harvester_datasets = harvester_datasets
+        self.__harvester_parse_workers = harvester_parse_workers
+        self.__harvester_parse_range_size = harvester_parse_range_size
+        self.__harvester_raw_storage = harvester_raw_storage
+        self.__harvester_retention_days = harvester_retention_days
+        self.__harvester_retention_interval = harvester_retention_interval
+        self.__harvester_retention_detach = harvester_retention_detach
+        self.__notifier_concurrency = notifier_concurrency
+        self.__notifier_timeout = notifier_timeout
 
     @property
     def database_url(self) -> str:
@@ -54,6 +100,94 @@ class Configuration:
     def http_port(self) -> int:
         return self.__http_port
 
+    @property
+    def matcher_workers(self) -> int:
+        return self.__matcher_workers
+
+    @property
+    def matcher_engine(self) -> str:
+        return self.__matcher_engine
+
+    @property
+    def matcher_debounce(self) -> float:
+        return self.__matcher_debounce
+
+    @property
+    def matcher_max_latency(self) -> float:
+        return self.__matcher_max_latency
+
+    @property
+    def matcher_cache_resync_interval(self) -> float:
+        return self.__matcher_cache_resync_interval
+
+    @property
+    def matcher_acquired_horizon_hours(self) -> float:
+        return self.__matcher_acquired_horizon_hours
+
+    @property
+    def harvester_strict_validation(self) -> bool:
+        return self.__harvester_strict_validation
+
+    @property
+    def harvester_commit_size(self) -> int:
+        return self.__harvester_commit_size
+
+    @property
+    def harvester_commit_interval(self) -> float:
+        return self.__harvester_commit_interval
+
+    @property
+    def harvester_interval(self) -> float:
+        return self.__harvester_interval
+
+    @property
+    def harvester_jitter(self) -> float:
+        return self.__harvester_jitter
+
+    @property
+    def harvester_concurrency(self) -> int:
+        return self.__harvester_concurrency
+
+    @property
+    def harvester_once(self) -> bool:
+        return self.__harvester_once
+
+    @property
+    def harvester_datasets(self) -> Optional[str]:
+        return self.__harvester_datasets
+
+    @property
+    def harvester_parse_workers(self) -> int:
+        return self.__harvester_parse_workers
+
+    @property
+    def harvester_parse_range_size(self) -> int:
+        return self.__harvester_parse_range_size
+
+    @property
+    def harvester_raw_storage(self) -> str:
+        return self.__harvester_raw_storage
+
+    @property
+    def harvester_retention_days(self) -> int:
+        return self.__harvester_retention_days
+
+    @property
+    def harvester_retention_interval(self) -> float:
+        return self.__harvester_retention_interval
+
+    @property
+    def harvester_retention_detach(self) -> bool:
+        return self.__harvester_retention_detach
+
+    @property
+    def notifier_concurrency(self) -> int:
+        return self.__notifier_concurrency
+
+    @property
+    def notifier_timeout(self) -> float:
+        return self.__notifier_timeout
+
 
 class ConfigurationSchema(Schema):
     database_url = String(required=True)
@@ -63,6 +197,48 @@ class ConfigurationSchema(Schema):
     aws_region_name = String(required=True)
     dry = Boolean(allow_none=True, load_default=True)
     http_port = Int(allow_none=True, load_default=8080)
+    matcher_workers = Int(allow_none=True, load_default=0)
+    matcher_engine = String(
+        allow_none=True,
+        load_default="python",
+        validate=OneOf(["python", "sql"]),
+    )
+    matcher_debounce = Float(allow_none=True, load_default=0.5)
+    matcher_max_latency = Float(allow_none=True, load_default=5.0)
+    matcher_cache_resync_interval = Float(allow_none=True, load_default=3600.0)
+    # off by default, the 24 hour window is on the harvest time, and fire
+    # locations of the 48h and 7d feeds or of replays are acquired earlier
+    matcher_acquired_horizon_hours = Float(
+        allow_none=True, load_default=0.0, validate=Range(min=0)
+    )
+    harvester_strict_validation = Boolean(allow_none=True, load_default=False)
+    harvester_commit_size = Int(allow_none=True, load_default=10000)
+    harvester_commit_interval = Float(allow_none=True, load_default=10.0)
+    harvester_interval = Float(
+        allow_none=True,
+        load_default=600.0,
+        validate=Range(min=0, min_inclusive=False),
+    )
+    harvester_jitter = Float(allow_none=True, load_default=30.0)
+    harvester_concurrency = Int(allow_none=True, load_default=2)
+    harvester_once = Boolean(allow_none=True, load_default=False)
+    harvester_datasets = String(allow_none=True, load_default=None)
+    harvester_parse_workers = Int(allow_none=True, load_default=0)
+    harvester_parse_range_size = Int(allow_none=True, load_default=8388608)
+    harvester_raw_storage = String(
+        allow_none=True,
+        load_default="json",
+        validate=OneOf(["json", "compressed", "none"]),
+    )
+    harvester_retention_days = Int(allow_none=True, load_default=0)
+    harvester_retention_interval = Float(
+        allow_none=True,
+        load_default=3600.0,
+        validate=Range(min=0, min_inclusive=False),
+    )
+    harvester_retention_detach = Boolean(allow_none=True, load_default=False)
+    notifier_concurrency = Int(allow_none=True, load_default=16)
+    notifier_timeout = Float(allow_none=True, load_default=10.0)
 
     # pylint: disable=no-self-use
     @post_load
@@ -73,11 +249,15 @@ class ConfigurationSchema(Schema):
 def load_from_environment() -> Configuration:
     load_dotenv()
 
+    # unset variables are left out so that the schema defaults apply
     return ConfigurationSchema().load(
         dict(
-            map(
-                lambda key: (key, getenv(key.upper())),
-                vars(ConfigurationSchema)["_declared_fields"].keys(),
+            filter(
+                lambda item: item[1] is not None,
+                map(
+                    lambda key: (key, getenv(key.upper())),
+                    vars(ConfigurationSchema)["_declared_fields"].keys(),
+                ),
             )
         )
     )
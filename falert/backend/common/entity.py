@@ -1,10 +1,26 @@
-from typing import List, Any
+from json import dumps, loads
+from typing import List, Any, Optional
 import uuid
-
-from sqlalchemy import Column, DateTime, Float, ForeignKey, func, JSON, Text
+import zlib
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    DDL,
+    event,
+    Float,
+    ForeignKey,
+    ForeignKeyConstraint,
+    func,
+    Index,
+    Integer,
+    JSON,
+    LargeBinary,
+    Text,
+)
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.orm import declarative_base, relationship
-from sqlalchemy.types import TypeDecorator, CHAR
+from sqlalchemy.orm import declarative_base, deferred, relationship
+from sqlalchemy.types import TypeDecorator, UserDefinedType, CHAR
 
 
 class UUID(TypeDecorator):
@@ -48,11 +64,69 @@ class UUID(TypeDecorator):
         raise NotImplementedError()
 
 
+def compress_json(value: Any) -> bytes:
+    return zlib.compress(dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+class CompressedJSON(TypeDecorator):
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Any:
+        # values can be compressed up front, out of the database session
+        if value is None or isinstance(value, bytes):
+            return value
+
+        return compress_json(value)
+
+    def process_result_value(self, value: Any, dialect: Any) -> Any:
+        if value is None:
+            return value
+
+        return loads(zlib.decompress(value))
+
+    def process_literal_param(self, value: Any, dialect: Any):
+        raise NotImplementedError()
+
+    @property
+    def python_type(self) -> Any:
+        raise NotImplementedError()
+
+
+class GeometricPoint(UserDefinedType):
+    cache_ok = True
+
+    def get_col_spec(self, **_kwargs) -> str:
+        return "POINT"
+
+    def process_literal_param(self, value: Any, dialect: Any):
+        raise NotImplementedError()
+
+    @property
+    def python_type(self) -> Any:
+        raise NotImplementedError()
+
+
+class GeometricPolygon(UserDefinedType):
+    cache_ok = True
+
+    def get_col_spec(self, **_kwargs) -> str:
+        return "POLYGON"
+
+    def process_literal_param(self, value: Any, dialect: Any):
+        raise NotImplementedError()
+
+    @property
+    def python_type(self) -> Any:
+        raise NotImplementedError()
+
+
 BaseEntity = declarative_base()
 
 
 class SubscriptionEntity(BaseEntity):
     __tablename__ = "subscriptions"
+    __table_args__ = (Index("ix_subscriptions_area", "area", postgresql_using="gist"),)
 
     id: UUID = Column(UUID(as_uuid=False), primary_key=True, default=uuid.uuid4)
 
@@ -73,6 +147,11 @@ class SubscriptionEntity(BaseEntity):
 
     phone_number = Column(Text, nullable=False)
 
+    # polygon of (latitude, longitude) vertices as WKB
+    geometry: bytes = Column(LargeBinary)
+    # the same polygon as native PostgreSQL type for matching in the database
+    area = deferred(Column(GeometricPolygon))
+
     created = Column(DateTime, server_default=func.now(), nullable=False)
     updated = Column(
         DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
@@ -137,12 +216,30 @@ class SubscriptionMatchEntity(BaseEntity):
 
 class SubscriptionMatchFireLocationEntity(BaseEntity):
     __tablename__ = "subscription_match_fire_locations"
+    __table_args__ = (
+        Index(
+            "ix_subscription_match_fire_locations_unique",
+            "subscription_id",
+            "fire_location_id",
+            "fire_location_acquired",
+            unique=True,
+        ),
+        ForeignKeyConstraint(
+            ["fire_location_id", "fire_location_acquired"],
+            ["fire_locations.id", "fire_locations.acquired"],
+            name="fk_subscription_match_fire_locations_fire_location",
+        ),
+        {"postgresql_partition_by": "RANGE (fire_location_acquired)"},
+    )
 
     id = Column(UUID(as_uuid=False), primary_key=True, default=uuid.uuid4)
 
-    fire_location_id: UUID = Column(
-        UUID(as_uuid=False), ForeignKey("fire_locations.id")
-    )
+    subscription_id: UUID = Column(UUID(as_uuid=False), ForeignKey("subscriptions.id"))
+
+    # the matches are partitioned like their fire locations, so the
+    # partitions of a day can be removed together
+    fire_location_id: UUID = Column(UUID(as_uuid=False))
+    fire_location_acquired = Column(DateTime, primary_key=True, nullable=False)
     fire_location: "FireLocationEntity" = relationship(
         "FireLocationEntity",
         back_populates="subscription_match_fire_locations",
@@ -168,6 +265,16 @@ class DatasetEntity(BaseEntity):
     id: UUID = Column(UUID(as_uuid=False), primary_key=True, default=uuid.uuid4)
     url: str = Column(Text, nullable=False, index=True, unique=True)
 
+    # validators of the last downloaded response, for conditional requests
+    etag: Optional[str] = Column(Text, nullable=True)
+    last_modified: Optional[str] = Column(Text, nullable=True)
+
+    # declaration from the dataset registry of the harvester
+    format: Optional[str] = Column(Text, nullable=True)
+    interval: Optional[float] = Column(Float, nullable=True)
+    priority: Optional[int] = Column(Integer, nullable=True)
+    chunk_size: Optional[int] = Column(Integer, nullable=True)
+
     dataset_harvests: List["DatasetHarvestEntity"] = relationship(
         "DatasetHarvestEntity", back_populates="dataset"
     )
@@ -189,6 +296,9 @@ class DatasetHarvestEntity(BaseEntity):
         back_populates="dataset_harvests",
     )
 
+    etag: Optional[str] = Column(Text, nullable=True)
+    last_modified: Optional[str] = Column(Text, nullable=True)
+
     fire_locations: List["FireLocationEntity"] = relationship(
         "FireLocationEntity", back_populates="dataset_harvest"
     )
@@ -201,11 +311,26 @@ class DatasetHarvestEntity(BaseEntity):
 
 class FireLocationEntity(BaseEntity):
     __tablename__ = "fire_locations"
+    __table_args__ = (
+        Index(
+            "ix_fire_locations_unique",
+            "dataset_id",
+            "latitude",
+            "longitude",
+            "acquired",
+            unique=True,
+        ),
+        {"postgresql_partition_by": "RANGE (acquired)"},
+    )
 
     id: UUID = Column(UUID(as_uuid=False), primary_key=True, default=uuid.uuid4)
 
+    # a fire location is reported once per dataset, across all its harvests
+    dataset_id: UUID = Column(UUID(as_uuid=False), ForeignKey("datasets.id"))
+
+    # every commit chunk of a harvest triggers a matching run on its rows
     dataset_harvest_id: UUID = Column(
-        UUID(as_uuid=False), ForeignKey("dataset_harvests.id")
+        UUID(as_uuid=False), ForeignKey("dataset_harvests.id"), index=True
     )
     dataset_harvest: "DatasetHarvestEntity" = relationship(
         "DatasetHarvestEntity", back_populates="fire_locations"
@@ -221,11 +346,38 @@ class FireLocationEntity(BaseEntity):
     latitude: float = Column(Float, nullable=False)
     longitude: float = Column(Float, nullable=False)
 
-    raw = Column(JSON, nullable=True)
+    brightness: Optional[float] = Column(Float, nullable=True)
+    frp: Optional[float] = Column(Float, nullable=True)
+    confidence: Optional[str] = Column(Text, nullable=True)
+    satellite: Optional[str] = Column(Text, nullable=True)
+    daynight: Optional[str] = Column(Text, nullable=True)
+    scan: Optional[float] = Column(Float, nullable=True)
+    track: Optional[float] = Column(Float, nullable=True)
+
+    # the whole row of the dataset is only kept for reference, either as is
+    # or compressed, depending on the harvester configuration
+    raw = deferred(Column(JSON, nullable=True))
+    raw_compressed = deferred(Column(CompressedJSON, nullable=True))
 
-    acquired = Column(DateTime, nullable=False)
+    # the table is partitioned by day on the acquisition time, which makes
+    # it part of every unique index
+    acquired = Column(DateTime, primary_key=True, nullable=False)
 
     created = Column(DateTime, server_default=func.now(), nullable=False)
     updated = Column(
         DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
     )
+
+
+# the position as native PostgreSQL type for matching in the database, it
+# isn't mapped so that the tables can be created on other databases as well
+for statement in [
+    # pylint: disable=line-too-long
+    "ALTER TABLE fire_locations ADD COLUMN position POINT GENERATED ALWAYS AS (point(latitude, longitude)) STORED",
+    "CREATE INDEX ix_fire_locations_position ON fire_locations USING gist (position)",
+]:
+    event.listen(
+        FireLocationEntity.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
@@ -1,14 +1,21 @@
 from uuid import UUID
 from typing import List, Any, Optional, Mapping
 from datetime import datetime
+from functools import lru_cache
 
-from marshmallow import Schema, fields, post_load
+from marshmallow import Schema, fields, post_load, validate
 
 
 class BaseInput:
     pass
 
 
+# a FIRMS file spans one or two days, so only a few thousand distinct values
+@lru_cache(maxsize=8192)
+def parse_acquired(acq_date: str, acq_time: str) -> datetime:
+    return datetime.strptime(f"{acq_date} {acq_time}", "%Y-%m-%d %H%M")
+
+
 class SubscriptionVertexInput(BaseInput):
     def __init__(self, longitude: float, latitude: float) -> None:
         super().__init__()
@@ -57,7 +64,10 @@ class SubscriptionInput(BaseInput):
 
 class SubscriptionInputSchema(Schema):
     phone_number = fields.String(required=True)
-    vertices = fields.List(fields.Nested(SubscriptionVertexInputSchema, required=True))
+    vertices = fields.List(
+        fields.Nested(SubscriptionVertexInputSchema, required=True),
+        validate=validate.Length(min=3),
+    )
 
     # pylint: disable=no-self-use
     @post_load
@@ -166,7 +176,7 @@ class NASAFireLocationInput(BaseInput):
 
     @property
     def acquired(self) -> datetime:
-        return datetime.strptime(f"{self.acq_date} {self.acq_time}", "%Y-%m-%d %H%M")
+        return parse_acquired(self.acq_date, self.acq_time)
 
 
 class NASAFireLocationInputSchema(Schema):
@@ -249,3 +259,69 @@ class TriggerNotifyingInputSchema(Schema):
         self, values: Mapping[str, Any], **_kwargs
     ) -> TriggerNotifyingInput:
         return TriggerNotifyingInput(**values)
+
+
+class DatasetInput(BaseInput):
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        url: str,
+        format: str,  # pylint: disable=redefined-builtin
+        priority: int,
+        chunk_size: int,
+        interval: Optional[float] = None,
+        replay_speed: Optional[float] = None,
+    ):
+        super().__init__()
+
+        self.__url = url
+        self.__format = format
+        self.__interval = interval
+        self.__priority = priority
+        self.__chunk_size = chunk_size
+        self.__replay_speed = replay_speed
+
+    @property
+    def url(self) -> str:
+        return self.__url
+
+    @property
+    def format(self) -> str:
+        return self.__format
+
+    @property
+    def interval(self) -> Optional[float]:
+        return self.__interval
+
+    @property
+    def priority(self) -> int:
+        return self.__priority
+
+    @property
+    def chunk_size(self) -> int:
+        return self.__chunk_size
+
+    @property
+    def replay_speed(self) -> Optional[float]:
+        return self.__replay_speed
+
+
+class DatasetInputSchema(Schema):
+    url = fields.String(required=True)
+    format = fields.String(
+        load_default="firms-csv", validate=validate.OneOf(["firms-csv"])
+    )
+    interval = fields.Float(
+        allow_none=True, validate=validate.Range(min=0, min_inclusive=False)
+    )
+    priority = fields.Int(load_default=0)
+    chunk_size = fields.Int(load_default=8192, validate=validate.Range(min=1))
+    # only for file:// urls, replays the rows in acquisition order
+    replay_speed = fields.Float(
+        allow_none=True, validate=validate.Range(min=0, min_inclusive=False)
+    )
+
+    # pylint: disable=no-self-use
+    @post_load
+    def _on_post_load(self, values: Mapping[str, Any], **_kwargs) -> DatasetInput:
+        return DatasetInput(**values)
@@ -1,5 +1,6 @@
-from asyncio import get_running_loop
+from asyncio import Lock, Queue, QueueEmpty
 from base64 import b64decode, b64encode
+from typing import Dict, List
 
 from asyncpg import Connection
 
@@ -13,22 +14,42 @@ class Sender:
 
 
 class Receiver:
+    async def listen(self, channel_name: str) -> None:
+        await self._on_listen(channel_name)
+
     async def receive(self, channel_name: str) -> str:
         data = await self._on_receive(channel_name)
         return b64decode(data).decode()
 
+    def receive_pending(self, channel_name: str) -> List[str]:
+        return list(
+            map(
+                lambda x: b64decode(x).decode(),
+                self._on_receive_pending(channel_name),
+            )
+        )
+
+    async def _on_listen(self, channel_name: str) -> None:
+        raise NotImplementedError()
+
     async def _on_receive(self, channel_name: str) -> str:
         raise NotImplementedError()
 
+    def _on_receive_pending(self, channel_name: str) -> List[str]:
+        raise NotImplementedError()
+
 
 class AsyncpgSender(Sender):
     def __init__(self, connection: Connection) -> None:
         super().__init__()
 
         self.__connection = connection
+        self.__lock = Lock()
 
+    # a connection runs one query at a time, senders may share it
     async def _on_send(self, channel_name: str, data: str) -> None:
-        await self.__connection.execute(f"NOTIFY {channel_name}, '{data}';")
+        async with self.__lock:
+            await self.__connection.execute(f"NOTIFY {channel_name}, '{data}';")
 
 
 class AsyncpgReceiver(Receiver):
@@ -36,14 +57,33 @@ class AsyncpgReceiver(Receiver):
         super().__init__()
 
         self.__connection = connection
+        self.__queues: Dict[str, Queue] = {}
+
+    # the listener stays registered, so notifications that arrive while no
+    # one is receiving are queued instead of lost
+    async def _on_listen(self, channel_name: str) -> None:
+        if channel_name in self.__queues:
+            return
+
+        queue: Queue = Queue()
+        self.__queues[channel_name] = queue
+
+        await self.__connection.add_listener(
+            channel_name,
+            lambda connection, channel_name, pid, data: queue.put_nowait(data),
+        )
 
     async def _on_receive(self, channel_name: str) -> str:
-        loop = get_running_loop()
-        future = loop.create_future()
-        listener = lambda connection, channel_name, pid, data: future.set_result(data)
+        await self._on_listen(channel_name)
+        return await self.__queues[channel_name].get()
+
+    def _on_receive_pending(self, channel_name: str) -> List[str]:
+        data = []
 
-        await self.__connection.add_listener(channel_name, listener)
-        data = await future
-        await self.__connection.remove_listener(channel_name, listener)
+        try:
+            while channel_name in self.__queues:
+                data.append(self.__queues[channel_name].get_nowait())
+        except QueueEmpty:
+            pass
 
         return data
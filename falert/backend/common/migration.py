@@ -0,0 +1,196 @@
+from itertools import groupby
+
+from sqlalchemy import and_, literal_column, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection
+from shapely import wkb
+from shapely.geometry import Polygon
+
+from falert.backend.common.entity import (
+    BaseEntity,
+    FireLocationEntity,
+    SubscriptionEntity,
+    SubscriptionVertexEntity,
+)
+from falert.backend.common.partition import PARTITIONED_TABLES, create_partitions
+
+# create_all only creates missing tables, these statements bring tables that
+# were created by an older version up to date and must stay idempotent
+POSTGRESQL_STATEMENTS = [
+    # pylint: disable=line-too-long
+    "ALTER TABLE subscription_match_fire_locations ADD COLUMN IF NOT EXISTS subscription_id UUID REFERENCES subscriptions (id)",
+    # pylint: disable=line-too-long
+    "UPDATE subscription_match_fire_locations SET subscription_id = subscription_matches.subscription_id FROM subscription_matches WHERE subscription_matches.id = subscription_match_fire_locations.subscription_match_id AND subscription_match_fire_locations.subscription_id IS NULL",
+    # partitioned tables are created with the index on the partition key too
+    # pylint: disable=line-too-long
+    "DO $$ BEGIN IF (SELECT relkind FROM pg_class WHERE relname = 'subscription_match_fire_locations') = 'r' THEN CREATE UNIQUE INDEX IF NOT EXISTS ix_subscription_match_fire_locations_unique ON subscription_match_fire_locations (subscription_id, fire_location_id); END IF; END $$",
+    "ALTER TABLE subscriptions ADD COLUMN IF NOT EXISTS geometry BYTEA",
+    "ALTER TABLE subscriptions ADD COLUMN IF NOT EXISTS area POLYGON",
+    "CREATE INDEX IF NOT EXISTS ix_subscriptions_area ON subscriptions USING gist (area)",
+    # the matcher selects subscriptions from its cache of their geometries,
+    # the bounds it used to prefilter them in the database are gone
+    "DROP INDEX IF EXISTS ix_subscriptions_bounds",
+    "ALTER TABLE subscriptions DROP COLUMN IF EXISTS min_latitude",
+    "ALTER TABLE subscriptions DROP COLUMN IF EXISTS min_longitude",
+    "ALTER TABLE subscriptions DROP COLUMN IF EXISTS max_latitude",
+    "ALTER TABLE subscriptions DROP COLUMN IF EXISTS max_longitude",
+    "ALTER TABLE datasets ADD COLUMN IF NOT EXISTS etag TEXT",
+    "ALTER TABLE datasets ADD COLUMN IF NOT EXISTS last_modified TEXT",
+    "ALTER TABLE datasets ADD COLUMN IF NOT EXISTS format TEXT",
+    "ALTER TABLE datasets ADD COLUMN IF NOT EXISTS interval FLOAT",
+    "ALTER TABLE datasets ADD COLUMN IF NOT EXISTS priority INTEGER",
+    "ALTER TABLE datasets ADD COLUMN IF NOT EXISTS chunk_size INTEGER",
+    "ALTER TABLE dataset_harvests ADD COLUMN IF NOT EXISTS etag TEXT",
+    "ALTER TABLE dataset_harvests ADD COLUMN IF NOT EXISTS last_modified TEXT",
+    # pylint: disable=line-too-long
+    "ALTER TABLE fire_locations ADD COLUMN IF NOT EXISTS dataset_id UUID REFERENCES datasets (id)",
+    # older harvests could store a fire location twice, only the first one of
+    # them gets the dataset, the others can't conflict with the unique index.
+    # That index is created right after, once it exists the backfill is done
+    # pylint: disable=line-too-long
+    "DO $$ BEGIN IF NOT EXISTS (SELECT FROM pg_class WHERE relname = 'ix_fire_locations_unique') THEN UPDATE fire_locations SET dataset_id = reported.dataset_id FROM (SELECT DISTINCT ON (dataset_harvests.dataset_id, fire_locations.latitude, fire_locations.longitude, fire_locations.acquired) fire_locations.id, dataset_harvests.dataset_id FROM fire_locations JOIN dataset_harvests ON dataset_harvests.id = fire_locations.dataset_harvest_id ORDER BY dataset_harvests.dataset_id, fire_locations.latitude, fire_locations.longitude, fire_locations.acquired, fire_locations.dataset_id IS NULL, fire_locations.created, fire_locations.id) AS reported WHERE reported.id = fire_locations.id AND fire_locations.dataset_id IS NULL; END IF; END $$",
+    # pylint: disable=line-too-long
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_fire_locations_unique ON fire_locations (dataset_id, latitude, longitude, acquired)",
+    "ALTER TABLE fire_locations ADD COLUMN IF NOT EXISTS raw_compressed BYTEA",
+    # the typed columns are filled from the stored rows when they are added,
+    # VIIRS datasets report the brightness as bright_ti4
+    # pylint: disable=line-too-long
+    "DO $$ BEGIN IF NOT EXISTS (SELECT FROM information_schema.columns WHERE table_name = 'fire_locations' AND column_name = 'satellite') THEN ALTER TABLE fire_locations ADD COLUMN brightness FLOAT, ADD COLUMN frp FLOAT, ADD COLUMN confidence TEXT, ADD COLUMN satellite TEXT, ADD COLUMN daynight TEXT, ADD COLUMN scan FLOAT, ADD COLUMN track FLOAT; UPDATE fire_locations SET brightness = COALESCE(NULLIF(raw->>'brightness', ''), NULLIF(raw->>'bright_ti4', ''))::FLOAT, frp = NULLIF(raw->>'frp', '')::FLOAT, confidence = NULLIF(raw->>'confidence', ''), satellite = NULLIF(raw->>'satellite', ''), daynight = NULLIF(raw->>'daynight', ''), scan = NULLIF(raw->>'scan', '')::FLOAT, track = NULLIF(raw->>'track', '')::FLOAT WHERE raw IS NOT NULL; END IF; END $$",
+    # pylint: disable=line-too-long
+    "CREATE INDEX IF NOT EXISTS ix_fire_locations_dataset_harvest_id ON fire_locations (dataset_harvest_id)",
+]
+
+
+def pack_subscription_vertices(connection: Connection) -> None:
+    # vertices have no explicit position, they used to be read in table order
+    rows = connection.execute(
+        select(
+            SubscriptionVertexEntity.subscription_id,
+            SubscriptionVertexEntity.latitude,
+            SubscriptionVertexEntity.longitude,
+        )
+        .join(SubscriptionVertexEntity.subscription)
+        # pylint: disable=singleton-comparison
+        .where(SubscriptionEntity.geometry == None)
+        .order_by(
+            SubscriptionVertexEntity.subscription_id,
+            literal_column("subscription_vertices.ctid"),
+        )
+    )
+
+    for subscription_id, vertices in groupby(rows, lambda x: x.subscription_id):
+        coordinates = list(map(lambda x: (x.latitude, x.longitude), vertices))
+
+        if len(coordinates) < 3:
+            continue
+
+        connection.execute(
+            update(SubscriptionEntity)
+            .where(SubscriptionEntity.id == subscription_id)
+            .values(geometry=Polygon(coordinates).wkb)
+        )
+
+
+def fill_subscription_areas(connection: Connection) -> None:
+    rows = connection.execute(
+        select(SubscriptionEntity.id, SubscriptionEntity.geometry).where(
+            and_(
+                # pylint: disable=singleton-comparison
+                SubscriptionEntity.area == None,
+                # pylint: disable=singleton-comparison
+                SubscriptionEntity.geometry != None,
+            )
+        )
+    )
+
+    for subscription_id, geometry in rows:
+        connection.execute(
+            update(SubscriptionEntity)
+            .where(SubscriptionEntity.id == subscription_id)
+            .values(area=wkb.loads(geometry).exterior.coords[:-1])
+        )
+
+
+async def partition_fire_locations(connection: AsyncConnection) -> None:
+    relkind = (
+        await connection.execute(
+            text("SELECT relkind::TEXT FROM pg_class WHERE relname = 'fire_locations'")
+        )
+    ).scalar()
+
+    # "p" is a partitioned table, older versions created a regular one
+    if relkind != "r":
+        return
+
+    for table_name in PARTITIONED_TABLES:
+        await connection.execute(
+            text(f"ALTER TABLE {table_name} RENAME TO {table_name}_unpartitioned")
+        )
+        await connection.execute(
+            text(
+                f"ALTER TABLE {table_name}_unpartitioned "
+                f"RENAME CONSTRAINT {table_name}_pkey TO {table_name}_unpartitioned_pkey"
+            )
+        )
+
+    for index_name in [
+        "ix_fire_locations_position",
+        "ix_fire_locations_unique",
+        "ix_fire_locations_dataset_harvest_id",
+        "ix_subscription_match_fire_locations_unique",
+    ]:
+        await connection.execute(
+            text(
+                f"ALTER INDEX IF EXISTS {index_name} RENAME TO {index_name}_unpartitioned"
+            )
+        )
+
+    await connection.run_sync(BaseEntity.metadata.create_all)
+
+    await create_partitions(
+        connection,
+        (
+            await connection.execute(
+                text("SELECT DISTINCT acquired::DATE FROM fire_locations_unpartitioned")
+            )
+        ).scalars(),
+    )
+
+    columns = ", ".join(column.name for column in FireLocationEntity.__table__.columns)
+
+    await connection.execute(
+        text(
+            f"INSERT INTO fire_locations ({columns}) "
+            f"SELECT {columns} FROM fire_locations_unpartitioned"
+        )
+    )
+
+    # pylint: disable=line-too-long
+    await connection.execute(
+        text(
+            "INSERT INTO subscription_match_fire_locations (id, subscription_id, fire_location_id, fire_location_acquired, subscription_match_id, created, updated) "
+            "SELECT matches.id, matches.subscription_id, matches.fire_location_id, fire_locations.acquired, matches.subscription_match_id, matches.created, matches.updated "
+            "FROM subscription_match_fire_locations_unpartitioned AS matches "
+            "JOIN fire_locations_unpartitioned AS fire_locations ON fire_locations.id = matches.fire_location_id"
+        )
+    )
+
+    for table_name in reversed(PARTITIONED_TABLES):
+        await connection.execute(text(f"DROP TABLE {table_name}_unpartitioned"))
+
+
+async def migrate(connection: AsyncConnection) -> None:
+    await connection.run_sync(BaseEntity.metadata.create_all)
+
+    if connection.dialect.name != "postgresql":
+        return
+
+    for statement in POSTGRESQL_STATEMENTS:
+        await connection.execute(text(statement))
+
+    await connection.run_sync(pack_subscription_vertices)
+    await connection.run_sync(fill_subscription_areas)
+
+    # the rows are copied in the migration transaction, which takes a while
+    # for large tables but only happens once
+    await partition_fire_locations(connection)
@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# fire locations and their matches are partitioned by the day the fire was
+# acquired, the matches of a day reference its fire locations
+PARTITIONED_TABLES = ["fire_locations", "subscription_match_fire_locations"]
+
+
+def get_partition_name(table_name: str, day: date) -> str:
+    return f"{table_name}_{day:%Y%m%d}"
+
+
+async def create_partitions(connection: AsyncConnection, days: Iterable[date]) -> None:
+    days = sorted(set(days))
+
+    if connection.dialect.name != "postgresql" or len(days) == 0:
+        return
+
+    # concurrent harvests would otherwise race to create the same partition
+    await connection.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext('partitions'))")
+    )
+
+    for day in days:
+        for table_name in PARTITIONED_TABLES:
+            await connection.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {get_partition_name(table_name, day)} "
+                    f"PARTITION OF {table_name} FOR VALUES "
+                    f"FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                )
+            )
+
+
+async def list_partitions(connection: AsyncConnection, table_name: str) -> List[date]:
+    result = await connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table_name"
+        ),
+        {"table_name": table_name},
+    )
+
+    return sorted(
+        datetime.strptime(name[len(table_name) + 1 :], "%Y%m%d").date()
+        for name in result.scalars()
+    )
+
+
+async def get_detached_name(connection: AsyncConnection, partition_name: str) -> str:
+    # a day can be detached again after a backfill of it, the tables of the
+    # earlier detachments keep their names
+    count = (
+        await connection.execute(
+            text(
+                "SELECT count(*) FROM pg_class "
+                "WHERE relkind = 'r' AND relname LIKE :pattern"
+            ),
+            {"pattern": f"{partition_name}\\_detached%"},
+        )
+    ).scalar_one()
+
+    if count == 0:
+        return f"{partition_name}_detached"
+
+    return f"{partition_name}_detached_{count + 1}"
+
+
+async def remove_partitions(
+    connection: AsyncConnection, before: date, detach: bool = False
+) -> List[date]:
+    if connection.dialect.name != "postgresql":
+        return []
+
+    removed_days = set()
+
+    # the matches go first, they reference the fire locations
+    for table_name in reversed(PARTITIONED_TABLES):
+        for day in await list_partitions(connection, table_name):
+            if day >= before:
+                continue
+
+            partition_name = get_partition_name(table_name, day)
+
+            # a partition referenced by the matches can only be dropped
+            # once it is detached
+            await connection.execute(
+                text(f"ALTER TABLE {table_name} DETACH PARTITION {partition_name}")
+            )
+
+            if not detach:
+                await connection.execute(text(f"DROP TABLE {partition_name}"))
+            else:
+                if table_name == "subscription_match_fire_locations":
+                    # a detached table of matches must not keep the partition
+                    # of its fire locations from being detached
+                    await connection.execute(
+                        text(
+                            f"ALTER TABLE {partition_name} DROP CONSTRAINT IF EXISTS "
+                            "fk_subscription_match_fire_locations_fire_location"
+                        )
+                    )
+
+                # a later backfill of the day creates its partition under
+                # this name, which has to be free for it
+                await connection.execute(
+                    text(
+                        f"ALTER TABLE {partition_name} RENAME TO "
+                        f"{await get_detached_name(connection, partition_name)}"
+                    )
+                )
+
+            removed_days.add(day)
+
+    return sorted(removed_days)
@@ -1,155 +1,105 @@
-from csv import DictReader
 from logging import Logger
-from asyncio import gather
+from asyncio import gather, get_running_loop
+from http import HTTPStatus
 from tempfile import NamedTemporaryFile
+from urllib.parse import urlparse
 
-from aiohttp import ClientSession
-from sqlalchemy import select
+from aiohttp import ClientResponse, ClientSession, hdrs
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
-from sqlalchemy.orm import sessionmaker, joinedload
 
 from falert.backend.common.application import AsynchronousApplication
-from falert.backend.common.output import (
-    TriggerMatchingOutput,
-    TriggerMatchingOutputSchema,
-)
-from falert.backend.common.entity import (
-    BaseEntity,
-    DatasetEntity,
-    FireLocationEntity,
-    DatasetHarvestEntity,
-)
-from falert.backend.common.input import NASAFireLocationInputSchema
+from falert.backend.common.entity import DatasetEntity
+from falert.backend.common.input import DatasetInput
 from falert.backend.common.messenger import AsyncpgSender, Sender
+from falert.backend.harvester.base import BaseHarvester, FireLocationHarvester
+from falert.backend.harvester.file import NASAFileHarvester
+from falert.backend.harvester.reader import read_csv_rows
+from falert.backend.harvester.registry import load_dataset_inputs, register_datasets
+from falert.backend.harvester.retention import FireLocationRetention
+from falert.backend.harvester.scheduler import HarvesterScheduler
 
 
-class BaseHarvester:
-    pass
-
-
-class NASAHarvester(BaseHarvester):
+class NASAHarvester(FireLocationHarvester):
     # pylint: disable=too-many-arguments
     def __init__(
         self,
         engine: AsyncEngine,
         sender: Sender,
         logger: Logger,
+        client_session: ClientSession,
         url: str,
         chunk_size: int = 8192,
+        **kwargs,
     ):
-        super().__init__()
+        super().__init__(engine, sender, logger, url, **kwargs)
 
-        self.__engine = engine
-        self.__sender = sender
-        self.__logger = logger
-        self.__url = url
+        self.__client_session = client_session
         self.__chunk_size = chunk_size
 
-    # pylint: disable=too-many-locals
-    async def run(self):
-        session_maker = sessionmaker(
-            self.__engine,
-            expire_on_commit=False,
-            class_=AsyncSession,
-        )
+    async def _on_harvest(
+        self, database_session: AsyncSession, dataset_entity: DatasetEntity
+    ) -> None:
+        headers = {}
 
-        async with session_maker() as database_session:
-            result = await database_session.execute(
-                select(DatasetEntity)
-                .options(
-                    joinedload(DatasetEntity.dataset_harvests).joinedload(
-                        DatasetHarvestEntity.fire_locations
-                    )
-                )
-                .where(DatasetEntity.url == self.__url)
-            )
+        if dataset_entity.etag is not None:
+            headers[hdrs.IF_NONE_MATCH] = dataset_entity.etag
 
-            dataset_entity = list(result.unique())
-            reported_fire_locations = {}
-
-            if dataset_entity is None or len(dataset_entity) == 0:
-                self.__logger.info("Create new dataset")
-                dataset_entity = DatasetEntity(url=self.__url)
-            else:
-                dataset_entity = dataset_entity[0][0]
-
-                for dataset_harvest_entity in dataset_entity.dataset_harvests:
-                    for fire_location in dataset_harvest_entity.fire_locations:
-                        reported_fire_locations[
-                            (
-                                fire_location.latitude,
-                                fire_location.longitude,
-                                fire_location.acquired,
-                            )
-                        ] = fire_location
-
-                self.__logger.info(
-                    # pylint: disable=line-too-long
-                    f"Update dataset {dataset_entity.id} with {len(reported_fire_locations)} fire locations"
-                )
+        if dataset_entity.last_modified is not None:
+            headers[hdrs.IF_MODIFIED_SINCE] = dataset_entity.last_modified
 
-            dataset_harvest_entity = DatasetHarvestEntity()
+        self._logger.info(f"Download {self._url} for dataset {dataset_entity.id}")
 
-            async with ClientSession() as client_session:
-                self.__logger.info(
-                    f"Download {self.__url} for dataset {dataset_entity.id}"
+        async with self.__client_session.get(self._url, headers=headers) as response:
+            if response.status == HTTPStatus.NOT_MODIFIED:
+                self._logger.info(
+                    f"Dataset {dataset_entity.id} is not modified since the last harvest"
                 )
+                return
 
-                async with client_session.get(self.__url) as response:
-                    with NamedTemporaryFile() as write_file:
-                        self.__logger.info(f"Save response for url {self.__url}")
-
-                        async for data in response.content.iter_chunked(
-                            self.__chunk_size
-                        ):
-                            write_file.write(data)
-
-                        write_file.flush()
-
-                        self.__logger.info(f"Read CSV data for url {self.__url}")
-
-                        with open(write_file.name, "r", encoding="utf-8") as read_file:
-                            reader = DictReader(read_file)
-
-                            for row in reader:
-                                fire_location_input = (
-                                    NASAFireLocationInputSchema().load(row)
-                                )
-
-                                if (
-                                    fire_location_input.latitude,
-                                    fire_location_input.longitude,
-                                    fire_location_input.acquired,
-                                ) not in reported_fire_locations:
-                                    dataset_harvest_entity.fire_locations.append(
-                                        FireLocationEntity(
-                                            latitude=fire_location_input.latitude,
-                                            longitude=fire_location_input.longitude,
-                                            raw=row,
-                                            acquired=fire_location_input.acquired,
-                                        )
-                                    )
-
-            self.__logger.info(
-                # pylint: disable=line-too-long
-                f"Add {len(dataset_harvest_entity.fire_locations)} new fire locations to dataset {dataset_entity.id}"
-            )
+            response.raise_for_status()
 
-            dataset_entity.dataset_harvests.append(dataset_harvest_entity)
-            database_session.add(dataset_entity)
-            await database_session.commit()
+            if self._parse_workers > 0:
+                await self.__ingest_file(database_session, dataset_entity, response)
+                return
 
-            trigger_matching_output = TriggerMatchingOutput(
-                dataset_harvest_ids=[
-                    dataset_harvest_entity.id,
-                ],
-            )
+            self._logger.info(f"Read CSV data for url {self._url}")
 
-            await self.__sender.send(
-                "trigger_matching",
-                TriggerMatchingOutputSchema().dumps(
-                    trigger_matching_output,
+            await self._ingest(
+                database_session,
+                dataset_entity,
+                self._decode(
+                    read_csv_rows(response.content.iter_chunked(self.__chunk_size))
                 ),
+                response.headers.get(hdrs.ETAG),
+                response.headers.get(hdrs.LAST_MODIFIED),
+            )
+
+    async def __ingest_file(
+        self,
+        database_session: AsyncSession,
+        dataset_entity: DatasetEntity,
+        response: ClientResponse,
+    ) -> None:
+        loop = get_running_loop()
+
+        # the worker processes split the file by their offsets, so the
+        # whole download is written to a temporary file first
+        with NamedTemporaryFile(suffix=".csv") as file:
+            async for data in response.content.iter_chunked(self.__chunk_size):
+                await loop.run_in_executor(None, file.write, data)
+
+            await loop.run_in_executor(None, file.flush)
+
+            self._logger.info(
+                f"Read CSV data for url {self._url} with {self._parse_workers} workers"
+            )
+
+            await self._ingest(
+                database_session,
+                dataset_entity,
+                self._decode_file(file.name),
+                response.headers.get(hdrs.ETAG),
+                response.headers.get(hdrs.LAST_MODIFIED),
             )
 
 
@@ -160,39 +110,98 @@ class Application(AsynchronousApplication):
         self.__sender = None
 
     async def main(self):
-        async with self._engine.begin() as connection:
+        # the sender keeps its connection for the lifetime of the application
+        async with self._engine.connect() as connection:
             raw_connection = await connection.get_raw_connection()
 
             self.__sender = AsyncpgSender(
                 raw_connection.dbapi_connection.driver_connection
             )
 
-        harvester0 = NASAHarvester(
-            self._engine,
-            self.__sender,
-            self._logger,
-            # pylint: disable=line-too-long
-            "https://firms.modaps.eosdis.nasa.gov/data/active_fire/modis-c6.1/csv/MODIS_C6_1_Global_24h.csv",
-        )
+            dataset_inputs = load_dataset_inputs(self._configuration.harvester_datasets)
 
-        harvester1 = NASAHarvester(
-            self._engine,
-            self.__sender,
-            self._logger,
-            # pylint: disable=line-too-long
-            "https://firms.modaps.eosdis.nasa.gov/data/active_fire/suomi-npp-viirs-c2/csv/SUOMI_VIIRS_C2_Global_24h.csv",
-        )
+            await register_datasets(self._engine, dataset_inputs)
+
+            async with ClientSession() as client_session:
+                harvesters = [
+                    (
+                        dataset_input,
+                        self.__create_harvester(client_session, dataset_input),
+                    )
+                    for dataset_input in dataset_inputs
+                ]
+
+                retention = None
+
+                if self._configuration.harvester_retention_days > 0:
+                    retention = FireLocationRetention(
+                        self._engine,
+                        self._logger,
+                        self._configuration.harvester_retention_days,
+                        self._configuration.harvester_retention_detach,
+                    )
+
+                if self._configuration.harvester_once:
+                    await gather(*(x.run() for _, x in harvesters))
+
+                    if retention is not None:
+                        await retention.run()
+
+                    return
 
-        harvester2 = NASAHarvester(
+                scheduler = HarvesterScheduler(
+                    self._logger, self._configuration.harvester_concurrency
+                )
+
+                for dataset_input, harvester in harvesters:
+                    scheduler.add(
+                        dataset_input.url,
+                        harvester,
+                        dataset_input.interval
+                        if dataset_input.interval is not None
+                        else self._configuration.harvester_interval,
+                        self._configuration.harvester_jitter,
+                        dataset_input.priority,
+                    )
+
+                if retention is not None:
+                    scheduler.add(
+                        "retention",
+                        retention,
+                        self._configuration.harvester_retention_interval,
+                    )
+
+                await scheduler.run()
+
+    def __create_harvester(
+        self, client_session: ClientSession, dataset_input: DatasetInput
+    ) -> FireLocationHarvester:
+        options = {
+            "commit_size": self._configuration.harvester_commit_size,
+            "commit_interval": self._configuration.harvester_commit_interval,
+            "strict_validation": self._configuration.harvester_strict_validation,
+            "raw_storage": self._configuration.harvester_raw_storage,
+            "parse_workers": self._configuration.harvester_parse_workers,
+            "parse_range_size": self._configuration.harvester_parse_range_size,
+        }
+
+        if urlparse(dataset_input.url).scheme == "file":
+            return NASAFileHarvester(
+                self._engine,
+                self.__sender,
+                self._logger,
+                dataset_input.url,
+                chunk_size=dataset_input.chunk_size,
+                replay_speed=dataset_input.replay_speed,
+                **options,
+            )
+
+        return NASAHarvester(
             self._engine,
             self.__sender,
             self._logger,
-            # pylint: disable=line-too-long
-            "https://firms.modaps.eosdis.nasa.gov/data/active_fire/noaa-20-viirs-c2/csv/J1_VIIRS_C2_Global_24h.csv",
-        )
-
-        await gather(
-            harvester0.run(),
-            harvester1.run(),
-            harvester2.run(),
+            client_session,
+            dataset_input.url,
+            chunk_size=dataset_input.chunk_size,
+            **options,
         )
@@ -0,0 +1,236 @@
+from asyncio import get_running_loop
+from logging import Logger
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from falert.backend.common.entity import DatasetEntity, DatasetHarvestEntity
+from falert.backend.common.messenger import Sender
+from falert.backend.common.partition import create_partitions
+from falert.backend.common.output import (
+    TriggerMatchingOutput,
+    TriggerMatchingOutputSchema,
+)
+from falert.backend.harvester.database import insert_fire_locations
+from falert.backend.harvester.decoder import (
+    DecodedRows,
+    NASAFireLocationDecoder,
+    decode_rows,
+)
+from falert.backend.harvester.parallel import decode_file_rows
+from falert.backend.harvester.reader import Rows, prefetch_rows
+
+
+class BaseHarvester:
+    async def run(self) -> None:
+        raise NotImplementedError()
+
+
+# pylint: disable=too-many-instance-attributes
+class FireLocationHarvester(BaseHarvester):
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        sender: Sender,
+        logger: Logger,
+        url: str,
+        prefetch_size: int = 64,
+        commit_size: int = 10000,
+        commit_interval: float = 10.0,
+        strict_validation: bool = False,
+        raw_storage: str = "json",
+        parse_workers: int = 0,
+        parse_range_size: int = 8388608,
+    ):
+        super().__init__()
+
+        self.__engine = engine
+        self.__sender = sender
+        self.__logger = logger
+        self.__url = url
+        self.__prefetch_size = prefetch_size
+        self.__commit_size = commit_size
+        self.__commit_interval = commit_interval
+        self.__decoder = NASAFireLocationDecoder(strict_validation, raw_storage)
+        self.__parse_workers = parse_workers
+        self.__parse_range_size = parse_range_size
+
+    @property
+    def _logger(self) -> Logger:
+        return self.__logger
+
+    @property
+    def _url(self) -> str:
+        return self.__url
+
+    @property
+    def _parse_workers(self) -> int:
+        return self.__parse_workers
+
+    def _decode(self, rows_iterator: AsyncIterator[Rows]) -> AsyncIterator[DecodedRows]:
+        return decode_rows(rows_iterator, self.__decoder)
+
+    # large files are split into ranges of lines, which are parsed
+    # and validated by a pool of worker processes
+    def _decode_file(self, path: str) -> AsyncIterator[DecodedRows]:
+        return decode_file_rows(
+            path,
+            self.__parse_workers,
+            self.__parse_range_size,
+            self.__decoder.strict_validation,
+            self.__decoder.raw_storage,
+        )
+
+    async def run(self) -> None:
+        session_maker = sessionmaker(
+            self.__engine,
+            expire_on_commit=False,
+            class_=AsyncSession,
+        )
+
+        async with session_maker() as database_session:
+            result = await database_session.execute(
+                select(DatasetEntity).where(DatasetEntity.url == self.__url)
+            )
+
+            dataset_entity = result.scalars().first()
+
+            if dataset_entity is None:
+                self.__logger.info("Create new dataset")
+                dataset_entity = DatasetEntity(id=uuid4(), url=self.__url)
+
+            await self._on_harvest(database_session, dataset_entity)
+
+    async def _on_harvest(
+        self, database_session: AsyncSession, dataset_entity: DatasetEntity
+    ) -> None:
+        raise NotImplementedError()
+
+    # pylint: disable=too-many-arguments, too-many-locals
+    async def _ingest(
+        self,
+        database_session: AsyncSession,
+        dataset_entity: DatasetEntity,
+        rows_iterator: AsyncIterator[DecodedRows],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        dataset_harvest_entity = None
+        fire_location_values = []
+        inserted_fire_locations = 0
+        loop = get_running_loop()
+        chunk_started = loop.time()
+
+        async for rows in prefetch_rows(rows_iterator, self.__prefetch_size):
+            # every committed chunk is a harvest of its own, so
+            # the matcher only looks at the fire locations of it
+            if dataset_harvest_entity is None and len(rows) > 0:
+                # the harvest is only written along with its chunk, after
+                # the partitions for it are created
+                # it isn't added to the harvests of the dataset, as it
+                # is deleted again if the chunk turns out to be empty
+                dataset_harvest_entity = DatasetHarvestEntity(
+                    id=uuid4(),
+                    dataset_id=dataset_entity.id,
+                    etag=etag,
+                    last_modified=last_modified,
+                )
+
+                database_session.add(dataset_entity)
+                database_session.add(dataset_harvest_entity)
+
+            for values in rows:
+                fire_location_values.append(
+                    {
+                        "id": uuid4(),
+                        "dataset_id": dataset_entity.id,
+                        "dataset_harvest_id": dataset_harvest_entity.id,
+                        **values,
+                    }
+                )
+
+            if (
+                0 < self.__commit_size <= len(fire_location_values)
+                or 0 < self.__commit_interval <= loop.time() - chunk_started
+            ):
+                inserted_fire_locations += await self.__commit_chunk(
+                    database_session,
+                    dataset_harvest_entity,
+                    fire_location_values,
+                )
+
+                dataset_harvest_entity = None
+                fire_location_values = []
+                chunk_started = loop.time()
+
+        # the validators are only stored with the last chunk, an
+        # interrupted harvest reads the whole file again
+        dataset_entity.etag = etag
+        dataset_entity.last_modified = last_modified
+        database_session.add(dataset_entity)
+
+        inserted_fire_locations += await self.__commit_chunk(
+            database_session,
+            dataset_harvest_entity,
+            fire_location_values,
+        )
+
+        self.__logger.info(
+            # pylint: disable=line-too-long
+            f"Add {inserted_fire_locations} new fire locations to dataset {dataset_entity.id}"
+        )
+
+    async def __commit_chunk(
+        self,
+        database_session: AsyncSession,
+        dataset_harvest_entity: Optional[DatasetHarvestEntity],
+        fire_location_values: List[Dict[str, Any]],
+    ) -> int:
+        # the partitions are created apart from the chunk, which keeps
+        # their lock short, and before the session writes anything they
+        # would have to wait for
+        if len(fire_location_values) > 0:
+            async with self.__engine.begin() as connection:
+                await create_partitions(
+                    connection, {x["acquired"].date() for x in fire_location_values}
+                )
+
+        await database_session.flush()
+
+        inserted_fire_locations = await insert_fire_locations(
+            database_session, fire_location_values
+        )
+
+        # a chunk of fire locations the dataset has already reported leaves
+        # no harvest behind, and there is nothing to match
+        if dataset_harvest_entity is not None and inserted_fire_locations == 0:
+            await database_session.delete(dataset_harvest_entity)
+
+        await database_session.commit()
+
+        if dataset_harvest_entity is None or inserted_fire_locations == 0:
+            return inserted_fire_locations
+
+        self.__logger.info(
+            # pylint: disable=line-too-long
+            f"Commit {inserted_fire_locations} new fire locations with dataset harvest {dataset_harvest_entity.id}"
+        )
+
+        trigger_matching_output = TriggerMatchingOutput(
+            dataset_harvest_ids=[
+                dataset_harvest_entity.id,
+            ],
+        )
+
+        await self.__sender.send(
+            "trigger_matching",
+            TriggerMatchingOutputSchema().dumps(
+                trigger_matching_output,
+            ),
+        )
+
+        return inserted_fire_locations
@@ -0,0 +1,91 @@
+from json import dumps
+from typing import Any, Dict, Sequence
+
+from sqlalchemy import JSON
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from falert.backend.common.entity import FireLocationEntity
+
+FIRE_LOCATION_KEY = ["dataset_id", "latitude", "longitude", "acquired"]
+
+
+async def insert_fire_locations(
+    database_session: AsyncSession,
+    fire_location_values: Sequence[Dict[str, Any]],
+) -> int:
+    if len(fire_location_values) == 0:
+        return 0
+
+    connection = await database_session.connection()
+
+    if connection.dialect.driver == "asyncpg":
+        return await copy_fire_locations(database_session, fire_location_values)
+
+    # fire locations the dataset has already reported are skipped by the
+    # unique index, so deduplication doesn't depend on the dataset history.
+    # Other databases than these have no ON CONFLICT clause for it
+    if connection.dialect.name == "postgresql":
+        statement = postgresql.insert(FireLocationEntity).on_conflict_do_nothing(
+            index_elements=FIRE_LOCATION_KEY
+        )
+    elif connection.dialect.name == "sqlite":
+        statement = sqlite.insert(FireLocationEntity).on_conflict_do_nothing(
+            index_elements=FIRE_LOCATION_KEY
+        )
+    else:
+        raise NotImplementedError(
+            f"Fire locations can't be inserted on {connection.dialect.name}"
+        )
+
+    result = await database_session.execute(statement, list(fire_location_values))
+
+    return max(result.rowcount, 0)
+
+
+async def copy_fire_locations(
+    database_session: AsyncSession,
+    fire_location_values: Sequence[Dict[str, Any]],
+) -> int:
+    connection = await database_session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.dbapi_connection.driver_connection
+
+    columns = list(fire_location_values[0].keys())
+    json_columns = {
+        column
+        for column in columns
+        if isinstance(FireLocationEntity.__table__.c[column].type, JSON)
+    }
+
+    # the rows are copied into a temporary table of the same column types,
+    # which lives until the end of the transaction, and moved from there so
+    # that rows already reported by the dataset can be skipped. Unlike the
+    # driver connection, the session begins a transaction for it if needed
+    await connection.exec_driver_sql(
+        "CREATE TEMPORARY TABLE IF NOT EXISTS fire_location_imports ON COMMIT DROP AS "
+        f"SELECT {', '.join(columns)} FROM fire_locations WITH NO DATA"
+    )
+
+    await driver_connection.copy_records_to_table(
+        "fire_location_imports",
+        records=[
+            tuple(
+                dumps(values[column]) if column in json_columns else values[column]
+                for column in columns
+            )
+            for values in fire_location_values
+        ],
+        columns=columns,
+    )
+
+    status = await driver_connection.execute(
+        f"INSERT INTO fire_locations ({', '.join(columns)}) "
+        f"SELECT {', '.join(columns)} FROM fire_location_imports "
+        f"ON CONFLICT ({', '.join(FIRE_LOCATION_KEY)}) DO NOTHING"
+    )
+
+    await driver_connection.execute("TRUNCATE fire_location_imports")
+
+    # the status of an insert is "INSERT 0 <rows>"
+    return int(status.split()[-1])
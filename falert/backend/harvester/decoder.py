@@ -0,0 +1,90 @@
+from operator import itemgetter
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional
+
+from falert.backend.common.entity import compress_json
+from falert.backend.common.input import NASAFireLocationInputSchema, parse_acquired
+from falert.backend.harvester.reader import Rows
+
+DecodedRows = List[Dict[str, Any]]
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    return float(value) if value else None
+
+
+class NASAFireLocationDecoder:
+    def __init__(
+        self, strict_validation: bool = False, raw_storage: str = "json"
+    ) -> None:
+        super().__init__()
+
+        self.__strict_validation = strict_validation
+        self.__raw_storage = raw_storage
+        self.__schema = NASAFireLocationInputSchema()
+        self.__columns = itemgetter("latitude", "longitude", "acq_date", "acq_time")
+
+    @property
+    def strict_validation(self) -> bool:
+        return self.__strict_validation
+
+    @property
+    def raw_storage(self) -> str:
+        return self.__raw_storage
+
+    def decode(self, row: Mapping[str, str]) -> Dict[str, Any]:
+        values = self.__decode_columns(row)
+
+        # the compression runs as part of the decoding, so it is done by
+        # the parse workers as well
+        if self.__raw_storage == "json":
+            values["raw"] = row
+        elif self.__raw_storage == "compressed":
+            values["raw_compressed"] = compress_json(row)
+
+        return values
+
+    def __decode_columns(self, row: Mapping[str, str]) -> Dict[str, Any]:
+        # the strict mode validates every column of the row with the schema,
+        # otherwise only the stored columns are converted
+        if self.__strict_validation:
+            fire_location_input = self.__schema.load(row)
+
+            return {
+                "latitude": fire_location_input.latitude,
+                "longitude": fire_location_input.longitude,
+                "acquired": fire_location_input.acquired,
+                "brightness": fire_location_input.brightness
+                if fire_location_input.brightness is not None
+                else fire_location_input.bright_ti4,
+                "frp": fire_location_input.frp,
+                "confidence": str(fire_location_input.confidence)
+                if fire_location_input.confidence is not None
+                else None,
+                "satellite": fire_location_input.satellite,
+                "daynight": fire_location_input.daynight,
+                "scan": fire_location_input.scan,
+                "track": fire_location_input.track,
+            }
+
+        latitude, longitude, acq_date, acq_time = self.__columns(row)
+
+        # MODIS datasets report the brightness, VIIRS ones bright_ti4
+        return {
+            "latitude": float(latitude),
+            "longitude": float(longitude),
+            "acquired": parse_acquired(acq_date, acq_time),
+            "brightness": _parse_float(row.get("brightness") or row.get("bright_ti4")),
+            "frp": _parse_float(row.get("frp")),
+            "confidence": row.get("confidence") or None,
+            "satellite": row.get("satellite") or None,
+            "daynight": row.get("daynight") or None,
+            "scan": _parse_float(row.get("scan")),
+            "track": _parse_float(row.get("track")),
+        }
+
+
+async def decode_rows(
+    rows_iterator: AsyncIterator[Rows], decoder: NASAFireLocationDecoder
+) -> AsyncIterator[DecodedRows]:
+    async for rows in rows_iterator:
+        yield [decoder.decode(row) for row in rows]
@@ -0,0 +1,176 @@
+from asyncio import get_running_loop, sleep
+from collections import deque
+from datetime import datetime
+from functools import partial
+from heapq import heapify, heappop, heappush
+from logging import Logger
+from operator import itemgetter
+from os import listdir
+from os.path import isdir, join
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from falert.backend.common.entity import DatasetEntity
+from falert.backend.common.input import parse_acquired
+from falert.backend.common.messenger import Sender
+from falert.backend.harvester.base import FireLocationHarvester
+from falert.backend.harvester.decoder import DecodedRows
+from falert.backend.harvester.reader import read_csv_rows, read_file_chunks
+
+
+def list_files(path: str) -> List[str]:
+    if not isdir(path):
+        return [path]
+
+    return sorted(
+        join(path, name)
+        for name in listdir(path)
+        if name.endswith(".csv") or name.endswith(".csv.gz")
+    )
+
+
+async def find_first_acquired(path: str, chunk_size: int = 65536) -> Optional[datetime]:
+    first_acquired = None
+
+    # only the acquisition time is parsed, the rows aren't decoded or kept
+    async for rows in read_csv_rows(read_file_chunks(path, chunk_size)):
+        for row in rows:
+            acquired = parse_acquired(row["acq_date"], row["acq_time"])
+
+            if first_acquired is None or acquired < first_acquired:
+                first_acquired = acquired
+
+    return first_acquired
+
+
+async def merge_rows(
+    files: Sequence[Tuple[datetime, Callable[[], AsyncIterator[DecodedRows]]]]
+) -> AsyncIterator[Dict[str, Any]]:
+    # every file is sorted on its own, and only decoded once the merge gets
+    # to its first acquisition, so just the files overlapping in time are
+    # held at once. Each file has one entry on the heap, either for its
+    # next row or, until it is decoded, for its first acquisition
+    heap = [
+        (first_acquired, index, False)
+        for index, (first_acquired, _) in enumerate(files)
+    ]
+    heapify(heap)
+
+    file_rows: Dict[int, Deque[Dict[str, Any]]] = {}
+
+    while len(heap) > 0:
+        _, index, decoded = heappop(heap)
+
+        if decoded:
+            yield file_rows[index].popleft()
+        else:
+            rows = [row async for batch in files[index][1]() for row in batch]
+            rows.sort(key=itemgetter("acquired"))
+            file_rows[index] = deque(rows)
+
+        if len(file_rows[index]) > 0:
+            heappush(heap, (file_rows[index][0]["acquired"], index, True))
+        else:
+            del file_rows[index]
+
+
+async def replay_rows(
+    rows_iterator: AsyncIterator[Dict[str, Any]], speed: float
+) -> AsyncIterator[DecodedRows]:
+    # the rows come in acquisition order, every minute of acquisitions is
+    # released after 60 / speed seconds
+    loop = get_running_loop()
+    started = loop.time()
+    first_acquired: Optional[datetime] = None
+    rows: DecodedRows = []
+
+    async for values in rows_iterator:
+        if len(rows) > 0 and values["acquired"] != rows[0]["acquired"]:
+            yield rows
+            rows = []
+
+        if len(rows) == 0:
+            if first_acquired is None:
+                first_acquired = values["acquired"]
+
+            delay = (values["acquired"] - first_acquired).total_seconds() / speed - (
+                loop.time() - started
+            )
+
+            if delay > 0:
+                await sleep(delay)
+
+        rows.append(values)
+
+    if len(rows) > 0:
+        yield rows
+
+
+class NASAFileHarvester(FireLocationHarvester):
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        sender: Sender,
+        logger: Logger,
+        url: str,
+        chunk_size: int = 65536,
+        replay_speed: Optional[float] = None,
+        **kwargs,
+    ):
+        super().__init__(engine, sender, logger, url, **kwargs)
+
+        self.__path = url2pathname(urlparse(url).path)
+        self.__chunk_size = chunk_size
+        self.__replay_speed = replay_speed
+
+    async def _on_harvest(
+        self, database_session: AsyncSession, dataset_entity: DatasetEntity
+    ) -> None:
+        paths = list_files(self.__path)
+
+        self._logger.info(
+            f"Read {len(paths)} file(s) from {self.__path} for dataset {dataset_entity.id}"
+        )
+
+        if self.__replay_speed is None:
+            rows_iterator = self.__decode_files(paths)
+        else:
+            self._logger.info(f"Replay {self.__path} at {self.__replay_speed}x")
+
+            files = []
+
+            for path in paths:
+                first_acquired = await find_first_acquired(path, self.__chunk_size)
+
+                if first_acquired is not None:
+                    files.append((first_acquired, partial(self.__decode_file, path)))
+
+            rows_iterator = replay_rows(merge_rows(files), self.__replay_speed)
+
+        await self._ingest(database_session, dataset_entity, rows_iterator)
+
+    async def __decode_files(self, paths: List[str]) -> AsyncIterator[DecodedRows]:
+        for path in paths:
+            async for rows in self.__decode_file(path):
+                yield rows
+
+    def __decode_file(self, path: str) -> AsyncIterator[DecodedRows]:
+        # compressed files can't be split, they are read in one go
+        if self._parse_workers > 0 and not path.endswith(".gz"):
+            return self._decode_file(path)
+
+        return self._decode(read_csv_rows(read_file_chunks(path, self.__chunk_size)))
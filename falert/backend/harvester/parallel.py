@@ -0,0 +1,118 @@
+from asyncio import Future, get_running_loop
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from csv import reader
+from os import SEEK_END
+from typing import Any, AsyncIterator, Deque, List, Optional, Tuple
+
+from falert.backend.harvester.decoder import DecodedRows, NASAFireLocationDecoder
+
+ByteRange = Tuple[int, int]
+Batch = Tuple[List[str], List[List[Any]]]
+
+
+def split_file(
+    path: str, range_size: int
+) -> Tuple[Optional[List[str]], List[ByteRange]]:
+    byte_ranges = []
+
+    # every range ends after a line break, so the workers only ever
+    # see complete records
+    with open(path, "rb") as file:
+        fieldnames = next(reader([file.readline().decode("utf-8")]), None)
+        start = file.tell()
+        size = file.seek(0, SEEK_END)
+
+        while start < size:
+            file.seek(min(start + max(range_size, 1), size))
+            file.readline()
+
+            byte_ranges.append((start, file.tell()))
+            start = file.tell()
+
+    return fieldnames, byte_ranges
+
+
+def _decode_range(
+    path: str,
+    byte_range: ByteRange,
+    fieldnames: List[str],
+    strict_validation: bool,
+    raw_storage: str,
+) -> Batch:
+    start, end = byte_range
+    decoder = NASAFireLocationDecoder(strict_validation, raw_storage)
+
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start).decode("utf-8")
+
+    fire_location_values = [
+        decoder.decode(dict(zip(fieldnames, record)))
+        for record in reader(data.split("\n"))
+        if len(record) > 0
+    ]
+
+    if len(fire_location_values) == 0:
+        return [], []
+
+    # the decoded values are passed by column, which is a lot cheaper
+    # between the processes than a dictionary per row
+    keys = list(fire_location_values[0].keys())
+
+    return keys, [[values[key] for values in fire_location_values] for key in keys]
+
+
+async def decode_file_rows(
+    path: str,
+    workers: int,
+    range_size: int = 8388608,
+    strict_validation: bool = False,
+    raw_storage: str = "json",
+) -> AsyncIterator[DecodedRows]:
+    loop = get_running_loop()
+    fieldnames, byte_ranges = await loop.run_in_executor(
+        None, split_file, path, range_size
+    )
+
+    if fieldnames is None:
+        return
+
+    pending: Deque[Future] = deque()
+    byte_ranges_iterator = iter(byte_ranges)
+
+    # two ranges per worker are parsed ahead of the ingestion, the results
+    # are taken in the order of the file
+    executor = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        while True:
+            for byte_range in byte_ranges_iterator:
+                pending.append(
+                    loop.run_in_executor(
+                        executor,
+                        _decode_range,
+                        path,
+                        byte_range,
+                        fieldnames,
+                        strict_validation,
+                        raw_storage,
+                    )
+                )
+
+                if len(pending) >= workers * 2:
+                    break
+
+            if len(pending) == 0:
+                break
+
+            keys, columns = await pending.popleft()
+
+            yield [dict(zip(keys, values)) for values in zip(*columns)]
+    finally:
+        # cancelling the futures cancels the ranges that haven't started, the
+        # workers finish the others without blocking the loop until they exit
+        for future in pending:
+            future.cancel()
+
+        executor.shutdown(wait=False)
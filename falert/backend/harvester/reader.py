@@ -0,0 +1,81 @@
+from asyncio import Queue, create_task, get_running_loop
+from codecs import getincrementaldecoder
+from gzip import GzipFile
+from csv import DictReader, reader
+from typing import AsyncIterator, Dict, List, Optional, TypeVar, Union
+
+Rows = List[Dict[str, str]]
+
+T = TypeVar("T")
+
+
+async def read_file_chunks(path: str, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+    loop = get_running_loop()
+
+    # gzip files are recognized by their name, reads run in the thread pool
+    with open(path, "rb") as raw_file:
+        file = GzipFile(fileobj=raw_file) if path.endswith(".gz") else raw_file
+
+        while True:
+            data = await loop.run_in_executor(None, file.read, chunk_size)
+
+            if len(data) == 0:
+                break
+
+            yield data
+
+
+async def read_csv_rows(
+    chunks: AsyncIterator[bytes], encoding: str = "utf-8"
+) -> AsyncIterator[Rows]:
+    # FIRMS files have no quoted line breaks, so every complete line of a
+    # chunk is a complete record and only the trailing partial one is kept
+    decoder = getincrementaldecoder(encoding)()
+    fieldnames: Optional[List[str]] = None
+    pending = ""
+
+    async for data in chunks:
+        *lines, pending = (pending + decoder.decode(data)).split("\n")
+
+        while fieldnames is None and len(lines) > 0:
+            fieldnames = next(reader([lines.pop(0)]), None)
+
+        if len(lines) > 0:
+            yield list(DictReader(lines, fieldnames=fieldnames))
+
+    pending += decoder.decode(b"", final=True)
+
+    if fieldnames is not None and len(pending.strip()) > 0:
+        yield list(DictReader([pending], fieldnames=fieldnames))
+
+
+async def prefetch_rows(rows: AsyncIterator[T], size: int) -> AsyncIterator[T]:
+    # the download goes on while the caller works on earlier rows, until
+    # the queue holds size chunks
+    queue: Queue[Union[T, BaseException, None]] = Queue(maxsize=size)
+
+    async def fill() -> None:
+        try:
+            async for item in rows:
+                await queue.put(item)
+        # pylint: disable=broad-except
+        except Exception as exception:
+            await queue.put(exception)
+        else:
+            await queue.put(None)
+
+    task = create_task(fill())
+
+    try:
+        while True:
+            item = await queue.get()
+
+            if item is None:
+                break
+
+            if isinstance(item, BaseException):
+                raise item
+
+            yield item
+    finally:
+        task.cancel()
@@ -0,0 +1,64 @@
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from falert.backend.common.entity import DatasetEntity
+from falert.backend.common.input import DatasetInput, DatasetInputSchema
+
+DEFAULT_DATASETS = [
+    {
+        # pylint: disable=line-too-long
+        "url": "https://firms.modaps.eosdis.nasa.gov/data/active_fire/modis-c6.1/csv/MODIS_C6_1_Global_24h.csv",
+    },
+    {
+        # pylint: disable=line-too-long
+        "url": "https://firms.modaps.eosdis.nasa.gov/data/active_fire/suomi-npp-viirs-c2/csv/SUOMI_VIIRS_C2_Global_24h.csv",
+    },
+    {
+        # pylint: disable=line-too-long
+        "url": "https://firms.modaps.eosdis.nasa.gov/data/active_fire/noaa-20-viirs-c2/csv/J1_VIIRS_C2_Global_24h.csv",
+    },
+]
+
+
+def load_dataset_inputs(path: Optional[str]) -> List[DatasetInput]:
+    if path is None:
+        return DatasetInputSchema(many=True).load(DEFAULT_DATASETS)
+
+    with open(path, "r", encoding="utf-8") as file:
+        return DatasetInputSchema(many=True).loads(file.read())
+
+
+async def register_datasets(
+    engine: AsyncEngine, dataset_inputs: List[DatasetInput]
+) -> None:
+    session_maker = sessionmaker(
+        engine,
+        expire_on_commit=False,
+        class_=AsyncSession,
+    )
+
+    async with session_maker() as database_session:
+        result = await database_session.execute(
+            select(DatasetEntity).where(
+                DatasetEntity.url.in_([x.url for x in dataset_inputs])
+            )
+        )
+
+        dataset_entities = {x.url: x for x in result.scalars()}
+
+        for dataset_input in dataset_inputs:
+            dataset_entity = dataset_entities.get(dataset_input.url)
+
+            if dataset_entity is None:
+                dataset_entity = DatasetEntity(url=dataset_input.url)
+                database_session.add(dataset_entity)
+
+            dataset_entity.format = dataset_input.format
+            dataset_entity.interval = dataset_input.interval
+            dataset_entity.priority = dataset_input.priority
+            dataset_entity.chunk_size = dataset_input.chunk_size
+
+        await database_session.commit()
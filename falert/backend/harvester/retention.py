@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+from logging import Logger
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from falert.backend.common.partition import remove_partitions
+from falert.backend.harvester.base import BaseHarvester
+
+
+# runs on the scheduler of the harvests, like one of them
+class FireLocationRetention(BaseHarvester):
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        logger: Logger,
+        days: int,
+        detach: bool = False,
+    ):
+        super().__init__()
+
+        self.__engine = engine
+        self.__logger = logger
+        self.__days = days
+        self.__detach = detach
+
+    async def run(self) -> None:
+        before = datetime.utcnow().date() - timedelta(days=self.__days)
+
+        async with self.__engine.begin() as connection:
+            removed_days = await remove_partitions(connection, before, self.__detach)
+
+        for day in removed_days:
+            self.__logger.info(
+                f"{'Detach' if self.__detach else 'Drop'} the fire locations of {day}"
+            )
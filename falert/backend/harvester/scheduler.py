@@ -0,0 +1,100 @@
+from asyncio import CancelledError, Future, Task, create_task, gather, sleep
+from heapq import heappop, heappush
+from itertools import count
+from logging import Logger
+from random import uniform
+from typing import Dict, List, Tuple
+
+from falert.backend.harvester.base import BaseHarvester
+
+
+class HarvesterScheduler:
+    def __init__(self, logger: Logger, concurrency: int = 2) -> None:
+        super().__init__()
+
+        self.__logger = logger
+        self.__slots = concurrency
+        self.__waiters: List[Tuple[int, int, Future]] = []
+        self.__counter = count()
+        self.__schedules: List[Tuple[str, BaseHarvester, float, float, int]] = []
+        self.__runs: Dict[str, Task] = {}
+
+    # pylint: disable=too-many-arguments
+    def add(
+        self,
+        name: str,
+        harvester: BaseHarvester,
+        interval: float,
+        jitter: float = 0.0,
+        priority: int = 0,
+    ) -> None:
+        self.__schedules.append((name, harvester, interval, jitter, priority))
+
+    async def run(self) -> None:
+        try:
+            await gather(*(self.__schedule(*schedule) for schedule in self.__schedules))
+        finally:
+            for task in self.__runs.values():
+                task.cancel()
+
+    # pylint: disable=too-many-arguments
+    async def __schedule(
+        self,
+        name: str,
+        harvester: BaseHarvester,
+        interval: float,
+        jitter: float,
+        priority: int,
+    ) -> None:
+        while True:
+            previous_run = self.__runs.get(name)
+
+            if previous_run is not None and not previous_run.done():
+                self.__logger.info(f"Skip harvest of {name}, it is still running")
+            else:
+                self.__runs[name] = create_task(
+                    self.__harvest(name, harvester, priority)
+                )
+
+            # the jitter keeps datasets with the same interval from
+            # downloading at the same moment
+            await sleep(max(interval + uniform(-jitter, jitter), 0.0))
+
+    async def __harvest(self, name: str, harvester: BaseHarvester, priority: int):
+        await self.__acquire(priority)
+
+        try:
+            self.__logger.info(f"Harvest {name}")
+            await harvester.run()
+        # pylint: disable=broad-except
+        except Exception:
+            self.__logger.exception(f"Harvest of {name} failed")
+        finally:
+            self.__release()
+
+    # harvests waiting for a free slot get it by priority, then in order
+    async def __acquire(self, priority: int) -> None:
+        if self.__slots > 0 and len(self.__waiters) == 0:
+            self.__slots -= 1
+            return
+
+        future: Future = Future()
+        heappush(self.__waiters, (-priority, next(self.__counter), future))
+
+        try:
+            await future
+        except CancelledError:
+            if future.done() and not future.cancelled():
+                self.__release()
+
+            raise
+
+    def __release(self) -> None:
+        while len(self.__waiters) > 0:
+            _, _, future = heappop(self.__waiters)
+
+            if not future.done():
+                future.set_result(None)
+                return
+
+        self.__slots += 1
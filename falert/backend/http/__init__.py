@@ -14,7 +14,7 @@ from falert.backend.http.middleware import (
     DetachDatabaseMiddleware,
     AttachSenderMiddleware,
 )
-from falert.backend.common.entity import BaseEntity
+from falert.backend.common.migration import migrate
 
 
 class Application(BaseApplication):
@@ -24,7 +24,7 @@ class Application(BaseApplication):
 
     async def __before_server_start(self, *_args, **_kwargs):
         async with self._engine.begin() as connection:
-            await connection.run_sync(BaseEntity.metadata.create_all)
+            await migrate(connection)
 
             raw_connection = await connection.get_raw_connection()
 
@@ -7,6 +7,7 @@ from sanic.request import Request
 from sanic.response import text, HTTPResponse, empty
 from sqlalchemy import select
 from sqlalchemy import func
+from shapely.geometry import Polygon
 
 from falert.backend.common.input import SubscriptionInputSchema
 from falert.backend.common.output import (
@@ -18,7 +19,6 @@ from falert.backend.common.output import (
 )
 from falert.backend.common.entity import (
     SubscriptionEntity,
-    SubscriptionVertexEntity,
     FireLocationEntity,
     SubscriptionMatchEntity,
 )
@@ -40,15 +40,13 @@ class SubscriptionCreateView(BaseView):
         subscription_input = SubscriptionInputSchema().load(loads(request.body))
         subscription_entity = SubscriptionEntity()
 
-        for vertex in subscription_input.vertices:
-            subscription_entity.subscription_vertices.append(
-                SubscriptionVertexEntity(
-                    longitude=vertex.longitude,
-                    latitude=vertex.latitude,
-                )
-            )
+        polygon = Polygon(
+            map(lambda x: (x.latitude, x.longitude), subscription_input.vertices)
+        )
 
         subscription_entity.phone_number = subscription_input.phone_number
+        subscription_entity.geometry = polygon.wkb
+        subscription_entity.area = polygon.exterior.coords[:-1]
 
         request.ctx.database_session.add(subscription_entity)
         await request.ctx.database_session.commit()
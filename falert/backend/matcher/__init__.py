@@ -1,13 +1,17 @@
+from asyncio import get_running_loop, sleep
+from time import monotonic
 from uuid import UUID
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional
 from datetime import timedelta, datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import sessionmaker, joinedload
-from sqlalchemy import select
-from shapely.geometry import Point, Polygon
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select, and_, true
 
-from falert.backend.common.input import TriggerMatchingInputSchema
+from falert.backend.common.input import (
+    TriggerMatchingInput,
+    TriggerMatchingInputSchema,
+)
 from falert.backend.common.output import (
     TriggerNotifyingOutput,
     TriggerNotifyingOutputSchema,
@@ -16,10 +20,22 @@ from falert.backend.common.application import AsynchronousApplication
 from falert.backend.common.messenger import AsyncpgReceiver, AsyncpgSender
 from falert.backend.common.entity import (
     SubscriptionEntity,
-    SubscriptionMatchEntity,
     SubscriptionMatchFireLocationEntity,
     FireLocationEntity,
 )
+from falert.backend.matcher.cache import SubscriptionGeometryCache
+from falert.backend.matcher.database import (
+    DatabaseMatchingStore,
+    build_matching_statement,
+    update_subscription_geometry_cache,
+)
+from falert.backend.matcher.engine import (
+    BaseMatchingEngine,
+    LocalMatchingEngine,
+    ProcessPoolMatchingEngine,
+)
+from falert.backend.matcher.process import match_in_process
+from falert.backend.matcher.trigger import coalesce_triggers
 
 
 class Application(AsynchronousApplication):
@@ -29,6 +45,15 @@ class Application(AsynchronousApplication):
         self.__receiver = None
         self.__sender = None
 
+        self.__matching_engine: BaseMatchingEngine = LocalMatchingEngine()
+        self.__subscription_geometry_cache = SubscriptionGeometryCache()
+        self.__subscription_geometry_cache_synced = 0.0
+
+        if self._configuration.matcher_workers > 0:
+            self.__matching_engine = ProcessPoolMatchingEngine(
+                self._configuration.matcher_workers
+            )
+
     async def main(self):
         async with self._engine.begin() as connection:
             raw_connection = await connection.get_raw_connection()
@@ -41,25 +66,71 @@ class Application(AsynchronousApplication):
                 raw_connection.dbapi_connection.driver_connection
             )
 
-            await self.__handle_matching(None, None)
+            await self.__receiver.listen("trigger_matching")
 
-            while True:
-                trigger_matching_input = TriggerMatchingInputSchema().loads(
-                    await self.__receiver.receive("trigger_matching")
-                )
+            if self._configuration.matcher_engine == "python":
+                await self.__sync_subscription_geometry_cache()
 
-                await self.__handle_matching(
-                    trigger_matching_input.subscription_ids,
-                    trigger_matching_input.dataset_harvest_ids,
-                )
+            try:
+                await self.__handle_matching(None, None)
 
-    # pylint: disable=too-many-locals
-    async def __handle_matching(
-        self,
-        subscription_ids: Optional[List[UUID]],
-        dataset_harvest_ids: Optional[List[UUID]],
-    ) -> None:
-        self._logger.info("Start matching")
+                while True:
+                    trigger_matching_inputs = await self.__receive_triggers()
+
+                    # subscriptions only get into the cache by their own trigger,
+                    # the resync picks up those whose notification got lost
+                    if (
+                        self._configuration.matcher_engine == "python"
+                        and 0
+                        < self._configuration.matcher_cache_resync_interval
+                        <= monotonic() - self.__subscription_geometry_cache_synced
+                    ):
+                        await self.__sync_subscription_geometry_cache()
+
+                    for subscription_ids, dataset_harvest_ids in coalesce_triggers(
+                        trigger_matching_inputs
+                    ):
+                        await self.__handle_matching(
+                            subscription_ids, dataset_harvest_ids
+                        )
+            finally:
+                self.__matching_engine.close()
+
+    async def __receive_triggers(self) -> List[TriggerMatchingInput]:
+        trigger_matching_inputs = [
+            TriggerMatchingInputSchema().loads(
+                await self.__receiver.receive("trigger_matching")
+            )
+        ]
+
+        loop = get_running_loop()
+        deadline = loop.time() + self._configuration.matcher_max_latency
+
+        # wait until no further trigger arrives within the debounce window,
+        # but never delay the first one for longer than the maximum latency
+        while loop.time() < deadline:
+            await sleep(
+                min(self._configuration.matcher_debounce, deadline - loop.time())
+            )
+
+            data = self.__receiver.receive_pending("trigger_matching")
+
+            if len(data) == 0:
+                break
+
+            trigger_matching_inputs.extend(
+                map(TriggerMatchingInputSchema().loads, data)
+            )
+
+        self._logger.info(
+            "Received %s matching trigger(s)",
+            len(trigger_matching_inputs),
+        )
+
+        return trigger_matching_inputs
+
+    async def __sync_subscription_geometry_cache(self) -> None:
+        self._logger.info("Fill the subscription geometry cache")
 
         session_maker = sessionmaker(
             self._engine,
@@ -67,148 +138,76 @@ class Application(AsynchronousApplication):
             class_=AsyncSession,
         )
 
-        fire_location_entities = []
-        subscription_entities = []
+        # filled from scratch, so deleted subscriptions are dropped as well
+        subscription_geometry_cache = SubscriptionGeometryCache()
 
         async with session_maker() as database_session:
-            if dataset_harvest_ids is None or len(dataset_harvest_ids) == 0:
-                self._logger.info("Fetch fire locations from the last 24 hours")
-
-                fire_location_entities = list(
-                    await database_session.execute(
-                        select(FireLocationEntity).where(
-                            FireLocationEntity.created
-                            >= datetime.utcnow() - timedelta(hours=24)
-                        )
-                    )
-                )
-            else:
-                self._logger.info(
-                    "Fetch all fire locations from dataset harvests with ids %s",
-                    ", ".join(map(str, dataset_harvest_ids)),
-                )
-
-                fire_location_entities = list(
-                    await database_session.execute(
-                        select(FireLocationEntity).where(
-                            FireLocationEntity.dataset_harvest_id.in_(
-                                dataset_harvest_ids
-                            )
-                        )
-                    )
-                )
-
-            if subscription_ids is None or len(subscription_ids) == 0:
-                self._logger.info("Fetch all subscriptions")
-
-                subscription_entities = list(
-                    (
-                        await database_session.execute(
-                            select(SubscriptionEntity)
-                            .options(
-                                joinedload(SubscriptionEntity.subscription_vertices)
-                            )
-                            .options(
-                                joinedload(
-                                    SubscriptionEntity.subscription_matches
-                                ).joinedload(
-                                    SubscriptionMatchEntity.subscription_match_fire_locations
-                                )
-                            )
-                        )
-                    ).unique()
-                )
-            else:
-                self._logger.info(
-                    "Fetch all subscriptions with ids %s",
-                    ", ".join(map(str, subscription_ids)),
-                )
+            await update_subscription_geometry_cache(
+                database_session, subscription_geometry_cache, true()
+            )
 
-                subscription_entities = list(
-                    (
-                        await database_session.execute(
-                            select(SubscriptionEntity)
-                            .where(SubscriptionEntity.id.in_(subscription_ids))
-                            .options(
-                                joinedload(SubscriptionEntity.subscription_vertices)
-                            )
-                            .options(
-                                joinedload(
-                                    SubscriptionEntity.subscription_matches
-                                ).joinedload(
-                                    SubscriptionMatchEntity.subscription_match_fire_locations
-                                )
-                            )
-                        )
-                    ).unique()
-                )
+        self.__subscription_geometry_cache = subscription_geometry_cache
+        self.__subscription_geometry_cache_synced = monotonic()
 
         self._logger.info(
-            "Match %s subscription(s) with %s fire location(s)",
-            len(subscription_entities),
-            len(fire_location_entities),
+            "Cached %s subscription geometries",
+            len(self.__subscription_geometry_cache),
         )
 
-        subscription_match_ids = []
+    async def __handle_matching(
+        self,
+        subscription_ids: Optional[List[UUID]],
+        dataset_harvest_ids: Optional[List[UUID]],
+    ) -> None:
+        self._logger.info("Start matching")
 
-        for (subscription_entity,) in subscription_entities:
-            async with session_maker() as database_session:
-                polygon = Polygon(
-                    map(
-                        lambda x: (x.latitude, x.longitude),
-                        subscription_entity.subscription_vertices,
-                    )
-                )
+        session_maker = sessionmaker(
+            self._engine,
+            expire_on_commit=False,
+            class_=AsyncSession,
+        )
 
-                subscription_entity_matches_fire_locations = set()
+        if dataset_harvest_ids is None or len(dataset_harvest_ids) == 0:
+            self._logger.info("Fetch fire locations from the last 24 hours")
 
-                for (
-                    subscription_match_entity
-                ) in subscription_entity.subscription_matches:
-                    for (
-                        subscription_match_fire_location_entity
-                    ) in subscription_match_entity.subscription_match_fire_locations:
-                        subscription_entity_matches_fire_locations.add(
-                            subscription_match_fire_location_entity.fire_location_id
-                        )
+            fire_location_condition = (
+                FireLocationEntity.created >= datetime.utcnow() - timedelta(hours=24)
+            )
 
-                subscription_match_entity = SubscriptionMatchEntity()
-                subscription_entity.subscription_matches.append(
-                    subscription_match_entity
+            # the partitions by acquisition time can only be skipped with a
+            # bound on it, which has to cover the longest harvested dataset
+            # and any replayed archive
+            if self._configuration.matcher_acquired_horizon_hours > 0:
+                fire_location_condition = and_(
+                    fire_location_condition,
+                    FireLocationEntity.acquired
+                    >= datetime.utcnow()
+                    - timedelta(
+                        hours=self._configuration.matcher_acquired_horizon_hours
+                    ),
                 )
+        else:
+            self._logger.info(
+                "Fetch all fire locations from dataset harvests with ids %s",
+                ", ".join(map(str, dataset_harvest_ids)),
+            )
 
-                for (fire_location_entity,) in fire_location_entities:
-                    fire_location_point = Point(
-                        fire_location_entity.latitude,
-                        fire_location_entity.longitude,
-                    )
-
-                    if (
-                        fire_location_entity.id
-                        not in subscription_entity_matches_fire_locations
-                        and polygon.contains(fire_location_point)
-                    ):
-                        subscription_match_entity.subscription_match_fire_locations.append(
-                            SubscriptionMatchFireLocationEntity(
-                                fire_location_id=fire_location_entity.id
-                            )
-                        )
-
-                if len(subscription_match_entity.subscription_match_fire_locations) > 0:
-                    self._logger.info(
-                        "Subscription %s has a match with %s new fire location(s)",
-                        subscription_entity.id,
-                        len(
-                            subscription_match_entity.subscription_match_fire_locations
-                        ),
-                    )
-
-                    database_session.add(subscription_entity)
-                    await database_session.commit()
+            fire_location_condition = FireLocationEntity.dataset_harvest_id.in_(
+                dataset_harvest_ids
+            )
 
-                    subscription_match_ids.append(
-                        subscription_match_entity.id,
-                    )
+        if self._configuration.matcher_engine == "sql":
+            subscription_match_ids = await self.__match_in_database(
+                session_maker,
+                fire_location_condition,
+                subscription_ids,
+            )
+        else:
+            subscription_match_ids = await self.__match_in_process(
+                session_maker,
+                fire_location_condition,
+                subscription_ids,
+            )
 
         if len(subscription_match_ids) > 0:
             trigger_notifying_output = TriggerNotifyingOutput(
@@ -223,3 +222,48 @@ class Application(AsynchronousApplication):
             )
 
         self._logger.info("Finish matching")
+
+    async def __match_in_database(
+        self,
+        session_maker: sessionmaker,
+        fire_location_condition: Any,
+        subscription_ids: Optional[List[UUID]],
+    ) -> List[UUID]:
+        self._logger.info("Match subscriptions with fire locations in the database")
+
+        async with session_maker() as database_session:
+            subscription_match_ids = list(
+                set(
+                    (
+                        await database_session.execute(
+                            build_matching_statement(
+                                fire_location_condition,
+                                subscription_ids,
+                            )
+                        )
+                    ).scalars()
+                )
+            )
+
+            await database_session.commit()
+
+        self._logger.info(
+            "%s subscription(s) have a match with new fire location(s)",
+            len(subscription_match_ids),
+        )
+
+        return subscription_match_ids
+
+    async def __match_in_process(
+        self,
+        session_maker: sessionmaker,
+        fire_location_condition: Any,
+        subscription_ids: Optional[List[UUID]],
+    ) -> List[UUID]:
+        return await match_in_process(
+            DatabaseMatchingStore(session_maker, fire_location_condition),
+            self.__subscription_geometry_cache,
+            self.__matching_engine,
+            self._logger,
+            subscription_ids,
+        )
@@ -0,0 +1,47 @@
+from array import array
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class FireLocationBuffer:
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.__ids = bytearray()
+        self.__latitudes = array("d")
+        self.__longitudes = array("d")
+        self.__acquired = array("q")
+
+    def __len__(self) -> int:
+        return len(self.__latitudes)
+
+    def append(
+        self,
+        fire_location_id: UUID,
+        latitude: float,
+        longitude: float,
+        acquired: datetime,
+    ):
+        self.__ids += fire_location_id.bytes
+        self.__latitudes.append(latitude)
+        self.__longitudes.append(longitude)
+        self.__acquired.append((acquired - EPOCH) // timedelta(microseconds=1))
+
+    def id(self, index: int) -> UUID:
+        return UUID(bytes=bytes(self.__ids[index * 16 : (index + 1) * 16]))
+
+    def acquired(self, index: int) -> datetime:
+        return EPOCH + timedelta(microseconds=self.__acquired[index])
+
+    # the arrays share memory with the buffer, which can't grow afterwards
+    @property
+    def latitudes(self) -> np.ndarray:
+        return np.frombuffer(self.__latitudes, dtype=np.float64)
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return np.frombuffer(self.__longitudes, dtype=np.float64)
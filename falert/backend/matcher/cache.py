@@ -0,0 +1,46 @@
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from shapely import wkb
+from shapely.prepared import PreparedGeometry, prep
+
+Bounds = Tuple[float, float, float, float]
+
+
+class SubscriptionGeometryCache:
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.__geometries: Dict[UUID, Tuple[Bounds, PreparedGeometry]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__geometries)
+
+    def update(self, subscription_id: UUID, geometry: bytes) -> None:
+        polygon = wkb.loads(geometry)
+        self.__geometries[subscription_id] = (polygon.bounds, prep(polygon))
+
+    def get(
+        self, subscription_ids: Iterable[UUID]
+    ) -> List[Tuple[UUID, PreparedGeometry]]:
+        return [
+            (subscription_id, self.__geometries[subscription_id][1])
+            for subscription_id in subscription_ids
+            if subscription_id in self.__geometries
+        ]
+
+    def intersect(
+        self,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+    ) -> List[Tuple[UUID, PreparedGeometry]]:
+        return [
+            (subscription_id, geometry)
+            for subscription_id, (bounds, geometry) in self.__geometries.items()
+            if bounds[0] <= max_latitude
+            and bounds[1] <= max_longitude
+            and bounds[2] >= min_latitude
+            and bounds[3] >= min_longitude
+        ]
@@ -0,0 +1,273 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, exists, func, literal_column, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from falert.backend.common.entity import (
+    FireLocationEntity,
+    GeometricPoint,
+    SubscriptionEntity,
+    SubscriptionMatchEntity,
+    SubscriptionMatchFireLocationEntity,
+)
+from falert.backend.matcher.cache import SubscriptionGeometryCache
+from falert.backend.matcher.process import (
+    BaseMatchingStore,
+    FireLocationRow,
+    NewMatch,
+)
+
+SUBSCRIPTION_MATCH_FIRE_LOCATION_KEY = [
+    "subscription_id",
+    "fire_location_id",
+    "fire_location_acquired",
+]
+
+# the position of the fire locations is only created on PostgreSQL
+FIRE_LOCATION_POSITION = literal_column("fire_locations.position", GeometricPoint)
+
+
+async def update_subscription_geometry_cache(
+    database_session: AsyncSession,
+    subscription_geometry_cache: SubscriptionGeometryCache,
+    subscription_condition: Any,
+) -> None:
+    subscription_result = await database_session.stream(
+        select(SubscriptionEntity.id, SubscriptionEntity.geometry).where(
+            and_(
+                # pylint: disable=singleton-comparison
+                SubscriptionEntity.geometry != None,
+                subscription_condition,
+            )
+        )
+    )
+
+    async for subscription_id, geometry in subscription_result:
+        subscription_geometry_cache.update(subscription_id, geometry)
+
+
+def build_matching_statement(
+    fire_location_condition: Any,
+    subscription_ids: Optional[List[UUID]],
+) -> Any:
+    candidate_query = (
+        select(
+            SubscriptionEntity.id.label("subscription_id"),
+            FireLocationEntity.id.label("fire_location_id"),
+            FireLocationEntity.acquired.label("fire_location_acquired"),
+        )
+        .select_from(FireLocationEntity)
+        .join(
+            SubscriptionEntity,
+            FIRE_LOCATION_POSITION.op("<@", is_comparison=True)(
+                SubscriptionEntity.area
+            ),
+        )
+        .where(fire_location_condition)
+        .where(
+            ~exists().where(
+                and_(
+                    SubscriptionMatchFireLocationEntity.subscription_id
+                    == SubscriptionEntity.id,
+                    SubscriptionMatchFireLocationEntity.fire_location_id
+                    == FireLocationEntity.id,
+                    SubscriptionMatchFireLocationEntity.fire_location_acquired
+                    == FireLocationEntity.acquired,
+                )
+            )
+        )
+    )
+
+    if subscription_ids is not None and len(subscription_ids) > 0:
+        candidate_query = candidate_query.where(
+            SubscriptionEntity.id.in_(subscription_ids)
+        )
+
+    candidates = candidate_query.cte("candidates")
+
+    # a volatile function keeps the CTE from being inlined, so every
+    # subscription gets one id for all of its fire locations
+    new_subscription_matches = (
+        select(
+            candidates.c.subscription_id,
+            func.gen_random_uuid().label("id"),
+        )
+        .group_by(candidates.c.subscription_id)
+        .cte("new_subscription_matches")
+    )
+
+    return build_subscription_match_statement(
+        postgresql.insert(SubscriptionMatchFireLocationEntity).from_select(
+            [
+                "id",
+                "subscription_id",
+                "subscription_match_id",
+                "fire_location_id",
+                "fire_location_acquired",
+            ],
+            select(
+                func.gen_random_uuid(),
+                candidates.c.subscription_id,
+                new_subscription_matches.c.id,
+                candidates.c.fire_location_id,
+                candidates.c.fire_location_acquired,
+            ).join(
+                new_subscription_matches,
+                new_subscription_matches.c.subscription_id
+                == candidates.c.subscription_id,
+            ),
+        )
+    )
+
+
+def build_subscription_match_statement(
+    subscription_match_fire_location_statement: Any,
+) -> Any:
+    # a match only gets inserted along with one of its fire locations, all of
+    # them may already be linked to the subscription. The foreign key of the
+    # links is checked at the end of the statement, after the matches exist
+    inserted_fire_locations = (
+        subscription_match_fire_location_statement.on_conflict_do_nothing(
+            index_elements=SUBSCRIPTION_MATCH_FIRE_LOCATION_KEY
+        )
+        .returning(
+            SubscriptionMatchFireLocationEntity.subscription_match_id,
+            SubscriptionMatchFireLocationEntity.subscription_id,
+        )
+        .cte("inserted_fire_locations")
+    )
+
+    return (
+        postgresql.insert(SubscriptionMatchEntity)
+        .from_select(
+            ["id", "subscription_id"],
+            select(
+                inserted_fire_locations.c.subscription_match_id,
+                inserted_fire_locations.c.subscription_id,
+            ).distinct(),
+        )
+        # the fire locations of a match can span several batches
+        .on_conflict_do_nothing(index_elements=["id"])
+        .returning(SubscriptionMatchEntity.id)
+    )
+
+
+async def insert_subscription_matches(
+    database_session: AsyncSession,
+    matches: Sequence[NewMatch],
+    batch_size: int = 5000,
+) -> List[UUID]:
+    subscription_match_fire_location_values: List[Dict[str, Any]] = []
+
+    for subscription_id, fire_locations in matches:
+        subscription_match_id = uuid4()
+
+        subscription_match_fire_location_values.extend(
+            {
+                "id": uuid4(),
+                "subscription_id": subscription_id,
+                "subscription_match_id": subscription_match_id,
+                "fire_location_id": fire_location_id,
+                "fire_location_acquired": fire_location_acquired,
+            }
+            for fire_location_id, fire_location_acquired in fire_locations
+        )
+
+    subscription_match_ids: Dict[UUID, None] = {}
+
+    for offset in range(0, len(subscription_match_fire_location_values), batch_size):
+        result = await database_session.execute(
+            build_subscription_match_statement(
+                postgresql.insert(SubscriptionMatchFireLocationEntity).values(
+                    subscription_match_fire_location_values[
+                        offset : offset + batch_size
+                    ]
+                )
+            )
+        )
+
+        subscription_match_ids.update(dict.fromkeys(result.scalars()))
+
+    return list(subscription_match_ids)
+
+
+class DatabaseMatchingStore(BaseMatchingStore):
+    def __init__(
+        self,
+        session_maker: sessionmaker,
+        fire_location_condition: Any,
+    ) -> None:
+        super().__init__()
+
+        self.__session_maker = session_maker
+        self.__fire_location_condition = fire_location_condition
+
+    # an asynchronous generator, which pylint takes for a coroutine
+    # pylint: disable=invalid-overridden-method
+    async def stream_fire_locations(
+        self, partition_size: int
+    ) -> AsyncIterator[List[FireLocationRow]]:
+        async with self.__session_maker() as database_session:
+            # only the needed columns, streamed through a server-side cursor
+            fire_location_result = await database_session.stream(
+                select(
+                    FireLocationEntity.id,
+                    FireLocationEntity.latitude,
+                    FireLocationEntity.longitude,
+                    FireLocationEntity.acquired,
+                ).where(self.__fire_location_condition)
+            )
+
+            async for partition in fire_location_result.partitions(partition_size):
+                yield partition
+
+    async def update_subscription_geometries(
+        self,
+        subscription_geometry_cache: SubscriptionGeometryCache,
+        subscription_ids: List[UUID],
+    ) -> None:
+        async with self.__session_maker() as database_session:
+            await update_subscription_geometry_cache(
+                database_session,
+                subscription_geometry_cache,
+                SubscriptionEntity.id.in_(subscription_ids),
+            )
+
+    async def select_matched_fire_locations(
+        self, subscription_ids: Optional[List[UUID]]
+    ) -> Set[Tuple[UUID, UUID]]:
+        matched_fire_location_query = (
+            select(
+                SubscriptionMatchFireLocationEntity.subscription_id,
+                SubscriptionMatchFireLocationEntity.fire_location_id,
+            )
+            .join(SubscriptionMatchFireLocationEntity.fire_location)
+            .where(self.__fire_location_condition)
+        )
+
+        if subscription_ids is not None and len(subscription_ids) > 0:
+            matched_fire_location_query = matched_fire_location_query.where(
+                SubscriptionMatchFireLocationEntity.subscription_id.in_(
+                    subscription_ids
+                )
+            )
+
+        async with self.__session_maker() as database_session:
+            return set(
+                map(tuple, await database_session.execute(matched_fire_location_query))
+            )
+
+    async def insert_subscription_matches(
+        self, matches: Sequence[NewMatch]
+    ) -> List[UUID]:
+        async with self.__session_maker() as database_session:
+            subscription_match_ids = await insert_subscription_matches(
+                database_session, matches
+            )
+
+            await database_session.commit()
+
+        return subscription_match_ids
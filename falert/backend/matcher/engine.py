@@ -0,0 +1,118 @@
+from asyncio import gather, get_running_loop
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+from shapely.geometry import Polygon
+from shapely.prepared import PreparedGeometry, prep
+
+from falert.backend.matcher.geometry import match_polygon
+from falert.backend.matcher.grid import FireLocationGrid
+
+Shape = Tuple[Any, PreparedGeometry]
+Match = Tuple[Any, np.ndarray]
+
+# pylint: disable=invalid-name
+_worker_fire_location_grid: Optional[Tuple[int, FireLocationGrid]] = None
+
+
+def _match_shapes(
+    shapes: Sequence[Shape], fire_location_grid: FireLocationGrid
+) -> List[Match]:
+    return [
+        (key, match_polygon(geometry, fire_location_grid)) for key, geometry in shapes
+    ]
+
+
+def _match_shard(
+    run: int,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    polygons: Sequence[Tuple[Any, Polygon]],
+) -> List[Match]:
+    # pylint: disable=global-statement
+    global _worker_fire_location_grid
+
+    # a worker builds the grid once per run, for the first of its shards
+    if _worker_fire_location_grid is None or _worker_fire_location_grid[0] != run:
+        _worker_fire_location_grid = (run, FireLocationGrid(latitudes, longitudes))
+
+    return _match_shapes(
+        [(key, prep(polygon)) for key, polygon in polygons],
+        _worker_fire_location_grid[1],
+    )
+
+
+class BaseMatchingEngine:
+    async def match(
+        self,
+        shapes: Sequence[Shape],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+    ) -> List[Match]:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        pass
+
+
+class LocalMatchingEngine(BaseMatchingEngine):
+    async def match(
+        self,
+        shapes: Sequence[Shape],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+    ) -> List[Match]:
+        return _match_shapes(shapes, FireLocationGrid(latitudes, longitudes))
+
+
+class ProcessPoolMatchingEngine(BaseMatchingEngine):
+    def __init__(self, workers: int, shards_per_worker: int = 4) -> None:
+        super().__init__()
+
+        self.__workers = workers
+        self.__shards_per_worker = shards_per_worker
+        self.__executor: Optional[ProcessPoolExecutor] = None
+        self.__runs = 0
+
+    async def match(
+        self,
+        shapes: Sequence[Shape],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+    ) -> List[Match]:
+        if len(shapes) == 0:
+            return []
+
+        if self.__executor is None:
+            # the workers are started once and kept for all runs, as every
+            # harvested chunk triggers a run of its own
+            self.__executor = ProcessPoolExecutor(max_workers=self.__workers)
+
+        loop = get_running_loop()
+        shards_count = min(len(shapes), self.__workers * self.__shards_per_worker)
+        self.__runs += 1
+
+        # the shards carry the polygons as prepared ones can't be pickled
+        polygons = [(key, geometry.context) for key, geometry in shapes]
+
+        results = await gather(
+            *(
+                loop.run_in_executor(
+                    self.__executor,
+                    _match_shard,
+                    self.__runs,
+                    latitudes,
+                    longitudes,
+                    polygons[shard::shards_count],
+                )
+                for shard in range(shards_count)
+            )
+        )
+
+        return [match for result in results for match in result]
+
+    def close(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
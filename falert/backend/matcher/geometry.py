@@ -0,0 +1,22 @@
+import numpy as np
+from shapely.prepared import PreparedGeometry
+from shapely.vectorized import contains
+
+from falert.backend.matcher.grid import FireLocationGrid
+
+
+def match_polygon(
+    geometry: PreparedGeometry, fire_location_grid: FireLocationGrid
+) -> np.ndarray:
+    candidates = fire_location_grid.query(*geometry.context.bounds)
+
+    if len(candidates) == 0:
+        return candidates
+
+    return candidates[
+        contains(
+            geometry,
+            fire_location_grid.latitudes[candidates],
+            fire_location_grid.longitudes[candidates],
+        )
+    ]
@@ -0,0 +1,92 @@
+from typing import Tuple
+
+import numpy as np
+
+
+class FireLocationGrid:
+    def __init__(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        cell_size: float = 1.0,
+    ) -> None:
+        super().__init__()
+
+        self.__latitudes = latitudes
+        self.__longitudes = longitudes
+        self.__cell_size = cell_size
+
+        rows = np.floor(latitudes / cell_size).astype(np.int64)
+        columns = np.floor(longitudes / cell_size).astype(np.int64)
+
+        if len(rows) > 0:
+            self.__origin = (int(rows.min()), int(columns.min()))
+            self.__shape = (
+                int(rows.max()) - self.__origin[0] + 1,
+                int(columns.max()) - self.__origin[1] + 1,
+            )
+        else:
+            self.__origin = (0, 0)
+            self.__shape = (0, 0)
+
+        cells = (rows - self.__origin[0]) * self.__shape[1] + (
+            columns - self.__origin[1]
+        )
+
+        self.__order = np.argsort(cells, kind="stable")
+        self.__cells = cells[self.__order]
+
+    def __len__(self) -> int:
+        return len(self.__latitudes)
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self.__latitudes
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self.__longitudes
+
+    def __cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (
+            int(np.floor(latitude / self.__cell_size)) - self.__origin[0],
+            int(np.floor(longitude / self.__cell_size)) - self.__origin[1],
+        )
+
+    def query(
+        self,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+    ) -> np.ndarray:
+        min_row, min_column = self.__cell(min_latitude, min_longitude)
+        max_row, max_column = self.__cell(max_latitude, max_longitude)
+
+        min_row, max_row = max(min_row, 0), min(max_row, self.__shape[0] - 1)
+        min_column = max(min_column, 0)
+        max_column = min(max_column, self.__shape[1] - 1)
+
+        if min_row > max_row or min_column > max_column:
+            return np.empty(0, dtype=np.int64)
+
+        # the cells of one grid row are contiguous in the sorted order
+        offsets = np.arange(min_row, max_row + 1) * self.__shape[1]
+        starts = np.searchsorted(self.__cells, offsets + min_column, side="left")
+        stops = np.searchsorted(self.__cells, offsets + max_column, side="right")
+
+        candidates = np.sort(
+            np.concatenate(
+                [self.__order[start:stop] for start, stop in zip(starts, stops)]
+            )
+        )
+
+        latitudes = self.__latitudes[candidates]
+        longitudes = self.__longitudes[candidates]
+
+        return candidates[
+            (latitudes >= min_latitude)
+            & (latitudes <= max_latitude)
+            & (longitudes >= min_longitude)
+            & (longitudes <= max_longitude)
+        ]
@@ -0,0 +1,147 @@
+from contextlib import nullcontext
+from datetime import datetime
+from logging import Logger
+from typing import (
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from uuid import UUID
+
+from falert.backend.matcher.buffer import FireLocationBuffer
+from falert.backend.matcher.cache import SubscriptionGeometryCache
+from falert.backend.matcher.engine import BaseMatchingEngine
+
+FIRE_LOCATION_PARTITION_SIZE = 10000
+
+FireLocationRow = Tuple[UUID, float, float, datetime]
+NewMatch = Tuple[UUID, Sequence[Tuple[UUID, datetime]]]
+
+
+class BaseMatchingStore:
+    # the fire locations of a run, and the matches it reads and writes
+    def stream_fire_locations(
+        self, partition_size: int
+    ) -> AsyncIterator[List[FireLocationRow]]:
+        raise NotImplementedError()
+
+    async def update_subscription_geometries(
+        self,
+        subscription_geometry_cache: SubscriptionGeometryCache,
+        subscription_ids: List[UUID],
+    ) -> None:
+        raise NotImplementedError()
+
+    async def select_matched_fire_locations(
+        self, subscription_ids: Optional[List[UUID]]
+    ) -> Set[Tuple[UUID, UUID]]:
+        raise NotImplementedError()
+
+    async def insert_subscription_matches(
+        self, matches: Sequence[NewMatch]
+    ) -> List[UUID]:
+        raise NotImplementedError()
+
+
+def measure_nothing(_stage: str) -> ContextManager[None]:
+    return nullcontext()
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+async def match_in_process(
+    store: BaseMatchingStore,
+    subscription_geometry_cache: SubscriptionGeometryCache,
+    matching_engine: BaseMatchingEngine,
+    logger: Logger,
+    subscription_ids: Optional[List[UUID]] = None,
+    measure: Callable[[str], ContextManager[None]] = measure_nothing,
+) -> List[UUID]:
+    if subscription_ids is not None and len(subscription_ids) > 0:
+        logger.info(
+            "Fetch all subscriptions with ids %s",
+            ", ".join(map(str, subscription_ids)),
+        )
+
+        # new subscriptions get into the cache by their own run, even if there
+        # are no fire locations to match yet, as later runs select from it
+        with measure("fetch"):
+            await store.update_subscription_geometries(
+                subscription_geometry_cache, subscription_ids
+            )
+
+    with measure("load"):
+        fire_location_buffer = FireLocationBuffer()
+
+        async for partition in store.stream_fire_locations(
+            FIRE_LOCATION_PARTITION_SIZE
+        ):
+            for fire_location_id, latitude, longitude, acquired in partition:
+                fire_location_buffer.append(
+                    fire_location_id, latitude, longitude, acquired
+                )
+
+        if len(fire_location_buffer) == 0:
+            return []
+
+        fire_location_latitudes = fire_location_buffer.latitudes
+        fire_location_longitudes = fire_location_buffer.longitudes
+
+    with measure("select"):
+        if subscription_ids is None or len(subscription_ids) == 0:
+            logger.info("Select cached subscriptions intersecting the fire locations")
+
+            subscription_geometries = subscription_geometry_cache.intersect(
+                float(fire_location_latitudes.min()),
+                float(fire_location_longitudes.min()),
+                float(fire_location_latitudes.max()),
+                float(fire_location_longitudes.max()),
+            )
+        else:
+            subscription_geometries = subscription_geometry_cache.get(subscription_ids)
+
+    logger.info(
+        "Match %s subscription(s) with %s fire location(s)",
+        len(subscription_geometries),
+        len(fire_location_buffer),
+    )
+
+    with measure("match"):
+        matches = await matching_engine.match(
+            subscription_geometries,
+            fire_location_latitudes,
+            fire_location_longitudes,
+        )
+
+    with measure("deduplicate"):
+        # only the matches of fire locations in this run can be duplicates
+        matched_fire_locations = await store.select_matched_fire_locations(
+            subscription_ids
+        )
+
+        new_matches = []
+
+        for subscription_id, indices in matches:
+            new_fire_locations = [
+                (fire_location_id, fire_location_buffer.acquired(index))
+                for index, fire_location_id in zip(
+                    indices, map(fire_location_buffer.id, indices)
+                )
+                if (subscription_id, fire_location_id) not in matched_fire_locations
+            ]
+
+            if len(new_fire_locations) > 0:
+                logger.info(
+                    "Subscription %s has a match with %s new fire location(s)",
+                    subscription_id,
+                    len(new_fire_locations),
+                )
+
+                new_matches.append((subscription_id, new_fire_locations))
+
+    with measure("insert"):
+        return await store.insert_subscription_matches(new_matches)
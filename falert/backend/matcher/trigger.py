@@ -0,0 +1,51 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from falert.backend.common.input import TriggerMatchingInput
+
+Trigger = Tuple[Optional[List[UUID]], Optional[List[UUID]]]
+
+
+def coalesce_triggers(
+    trigger_matching_inputs: Sequence[TriggerMatchingInput],
+) -> List[Trigger]:
+    # triggers are merged per kind, as a missing list means "all subscriptions"
+    # or "all recent fire locations" and can't be merged with an explicit one
+    subscription_ids: Dict[Tuple[bool, bool], Dict[UUID, None]] = {}
+    dataset_harvest_ids: Dict[Tuple[bool, bool], Dict[UUID, None]] = {}
+
+    for trigger_matching_input in trigger_matching_inputs:
+        kind = (
+            bool(trigger_matching_input.subscription_ids),
+            bool(trigger_matching_input.dataset_harvest_ids),
+        )
+
+        subscription_ids.setdefault(kind, {}).update(
+            dict.fromkeys(trigger_matching_input.subscription_ids or [])
+        )
+        dataset_harvest_ids.setdefault(kind, {}).update(
+            dict.fromkeys(trigger_matching_input.dataset_harvest_ids or [])
+        )
+
+    # a run over all subscriptions and recent fire locations covers every
+    # other, except that new subscriptions only get into the geometry cache
+    # by a run of their own, which has to go first
+    if (False, False) in subscription_ids:
+        pending_subscription_ids = dict.fromkeys(
+            subscription_id
+            for kind_subscription_ids in subscription_ids.values()
+            for subscription_id in kind_subscription_ids
+        )
+
+        if len(pending_subscription_ids) == 0:
+            return [(None, None)]
+
+        return [(list(pending_subscription_ids), None), (None, None)]
+
+    return [
+        (
+            list(kind_subscription_ids) if kind[0] else None,
+            list(dataset_harvest_ids[kind]) if kind[1] else None,
+        )
+        for kind, kind_subscription_ids in subscription_ids.items()
+    ]
@@ -1,8 +1,13 @@
+from asyncio import Semaphore, TimeoutError as AsyncioTimeoutError
+from asyncio import gather, get_running_loop, wait_for
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
+from functools import partial
 from typing import List, Optional
 from uuid import UUID
 
 from boto3 import client
+from botocore.config import Config
 from sqlalchemy import select, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker, joinedload, aliased
@@ -22,15 +27,30 @@ class Application(AsynchronousApplication):
         super().__init__()
 
         self.__receiver = None
-        # pylint: disable=unused-private-member
+        self.__semaphore = None
         self.__sns_client = client(
             "sns",
             aws_access_key_id=self._configuration.aws_access_key_id,
             aws_secret_access_key=self._configuration.aws_secret_access_key,
             region_name=self._configuration.aws_region_name,
+            # a timed out publish may still have been sent, a retry could
+            # send the SMS twice, the next run notifies it again instead
+            config=Config(
+                connect_timeout=self._configuration.notifier_timeout,
+                read_timeout=self._configuration.notifier_timeout,
+                max_pool_connections=self._configuration.notifier_concurrency,
+                retries={"max_attempts": 0},
+            ),
+        )
+        # the client is synchronous, it publishes on these threads so the
+        # loop keeps receiving triggers
+        self.__executor = ThreadPoolExecutor(
+            max_workers=self._configuration.notifier_concurrency
         )
 
     async def main(self):
+        self.__semaphore = Semaphore(self._configuration.notifier_concurrency)
+
         async with self._engine.begin() as connection:
             raw_connection = await connection.get_raw_connection()
 
@@ -148,25 +168,51 @@ class Application(AsynchronousApplication):
             len(subscription_entities),
         )
 
-        for (subscription_entity,) in subscription_entities:
+        await gather(
+            *(
+                self.__notify(session_maker, subscription_entity)
+                for (subscription_entity,) in subscription_entities
+            )
+        )
+
+        self._logger.info("Finish notifying")
+
+    async def __notify(
+        self, session_maker: sessionmaker, subscription_entity: SubscriptionEntity
+    ):
+        async with self.__semaphore:
             self._logger.info(
                 "Notify subscription id %s",
                 subscription_entity.id,
             )
 
             try:
-                async with session_maker() as database_session:
-                    self.__sns_client.publish(
-                        PhoneNumber=subscription_entity.phone_number,
-                        Message="There have been detected several fire locations",
-                    )
+                # a message that timed out may still be delivered, it's not
+                # recorded and gets sent again by a later run
+                await wait_for(
+                    get_running_loop().run_in_executor(
+                        self.__executor,
+                        partial(
+                            self.__sns_client.publish,
+                            PhoneNumber=subscription_entity.phone_number,
+                            Message="There have been detected several fire locations",
+                        ),
+                    ),
+                    self._configuration.notifier_timeout,
+                )
 
+                async with session_maker() as database_session:
                     subscription_entity.subscription_notifications.append(
                         SubscriptionNotificationEntity()
                     )
 
                     database_session.add(subscription_entity)
                     await database_session.commit()
+            except AsyncioTimeoutError:
+                self._logger.error(
+                    "Timeout notifying subscription %s",
+                    subscription_entity.id,
+                )
             # pylint: disable=broad-except
             except BaseException as error:
                 self._logger.error(
@@ -174,5 +220,3 @@ class Application(AsynchronousApplication):
                     subscription_entity.id,
                     error,
                 )
-
-        self._logger.info("Finish notifying")
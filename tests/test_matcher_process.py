@@ -0,0 +1,84 @@
+from datetime import datetime
+from logging import getLogger
+from typing import AsyncIterator, List, Optional, Sequence, Set, Tuple
+from unittest import IsolatedAsyncioTestCase
+from uuid import UUID, uuid4
+
+from shapely.geometry import Polygon
+
+from falert.backend.matcher.cache import SubscriptionGeometryCache
+from falert.backend.matcher.engine import LocalMatchingEngine
+from falert.backend.matcher.process import (
+    BaseMatchingStore,
+    FireLocationRow,
+    NewMatch,
+    match_in_process,
+)
+
+
+class MemoryStore(BaseMatchingStore):
+    def __init__(
+        self,
+        subscriptions: List[Tuple[UUID, bytes]],
+        fire_locations: List[FireLocationRow],
+    ) -> None:
+        super().__init__()
+
+        self.__subscriptions = subscriptions
+        self.__fire_locations = fire_locations
+
+    # pylint: disable=invalid-overridden-method
+    async def stream_fire_locations(
+        self, partition_size: int
+    ) -> AsyncIterator[List[FireLocationRow]]:
+        for offset in range(0, len(self.__fire_locations), partition_size):
+            yield self.__fire_locations[offset : offset + partition_size]
+
+    async def update_subscription_geometries(
+        self,
+        subscription_geometry_cache: SubscriptionGeometryCache,
+        subscription_ids: List[UUID],
+    ) -> None:
+        for subscription_id, geometry in self.__subscriptions:
+            if subscription_id in subscription_ids:
+                subscription_geometry_cache.update(subscription_id, geometry)
+
+    async def select_matched_fire_locations(
+        self, subscription_ids: Optional[List[UUID]]
+    ) -> Set[Tuple[UUID, UUID]]:
+        return set()
+
+    async def insert_subscription_matches(
+        self, matches: Sequence[NewMatch]
+    ) -> List[UUID]:
+        return [subscription_id for subscription_id, _ in matches]
+
+
+class MatchInProcessTest(IsolatedAsyncioTestCase):
+    async def test_caches_subscriptions_without_fire_locations(self) -> None:
+        subscription_id = uuid4()
+        subscriptions = [
+            (subscription_id, Polygon([(0.0, 0.0), (0.0, 1.0), (1.0, 1.0)]).wkb)
+        ]
+        subscription_geometry_cache = SubscriptionGeometryCache()
+
+        subscription_match_ids = await match_in_process(
+            MemoryStore(subscriptions, []),
+            subscription_geometry_cache,
+            LocalMatchingEngine(),
+            getLogger(__name__),
+            [subscription_id],
+        )
+
+        self.assertEqual(subscription_match_ids, [])
+        self.assertEqual(len(subscription_geometry_cache), 1)
+
+        # a later run of harvested fire locations selects it from the cache
+        subscription_match_ids = await match_in_process(
+            MemoryStore(subscriptions, [(uuid4(), 0.25, 0.75, datetime(2022, 3, 1))]),
+            subscription_geometry_cache,
+            LocalMatchingEngine(),
+            getLogger(__name__),
+        )
+
+        self.assertEqual(subscription_match_ids, [subscription_id])